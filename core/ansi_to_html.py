@@ -45,34 +45,72 @@ class Style:
         self.underline = False
 
 
-def ansi_to_html(text: str) -> str:
-    style = Style()
-    output = []
-    last = 0
+# A trailing escape sequence that may still be completed by the next chunk
+PARTIAL_ANSI_REGEX = re.compile(r"\x1b(\[[0-9;]*)?$")
+
+class AnsiHtmlStream:
+    # Converts output chunk by chunk, keeping the current style and any escape
+    # sequence cut at a chunk boundary. Each call returns only the HTML for the new
+    # text. Spans never cross a line: every "\n" of the input is kept as a bare
+    # "\n" in the output, so callers can split it into lines/blocks.
+    def __init__(self):
+        self.style = Style()
+        self._pending = ""
+
+    def feed(self, text: str) -> str:
+        text = self._pending + text
+        self._pending = ""
+
+        partial = PARTIAL_ANSI_REGEX.search(text)
+        if partial:
+            self._pending = text[partial.start():]
+            text = text[:partial.start()]
+
+        output = []
+        last = 0
+        for match in ANSI_REGEX.finditer(text):
+            output.append(self._styled(text[last:match.start()]))
+            self._apply(match.group(1))
+            last = match.end()
+        output.append(self._styled(text[last:]))
+        return "".join(output)
 
-    for match in ANSI_REGEX.finditer(text):
-        output.append(escape(text[last:match.start()]))
+    def flush(self) -> str:
+        pending = self._pending
+        self._pending = ""
+        return self._styled(pending)
 
-        codes = match.group(1)
-        for code in map(int, filter(None, codes.split(";") or ["0"])):
+    def reset(self):
+        self.style.reset()
+        self._pending = ""
+
+    def _apply(self, codes: str):
+        # Empty parameters (ESC[m, ESC[1;m, ESC[;31m) mean 0
+        for code in (int(part or 0) for part in codes.split(";")):
             if code == 0:
-                style.reset()
+                self.style.reset()
             elif code == 1:
-                style.bold = True
+                self.style.bold = True
             elif code == 4:
-                style.underline = True
+                self.style.underline = True
             elif code in COLOR_MAP:
-                style.color = COLOR_MAP[code]
+                self.style.color = COLOR_MAP[code]
 
-        span_start = f'<span style="{style.to_css()}">' if style.to_css() else ""
-        span_end = "</span>" if span_start else ""
+    def _styled(self, text: str) -> str:
+        if not text:
+            return ""
+        css = self.style.to_css()
+        if not css:
+            return escape(text)
+        return "\n".join(
+            f'<span style="{css}">{escape(line)}</span>' if line else ""
+            for line in text.split("\n")
+        )
 
-        output.append(span_start)
-        last = match.end()
 
-    output.append(escape(text[last:]))
-
-    return "<pre>" + "".join(output) + "</pre>"
+def ansi_to_html(text: str) -> str:
+    stream = AnsiHtmlStream()
+    return "<pre>" + stream.feed(text) + stream.flush() + "</pre>"
 
 def escape(s: str) -> str:
     return (
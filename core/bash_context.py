@@ -1,13 +1,61 @@
-from typing import List, Dict
+import re
+from contextlib import contextmanager
+from typing import List, Dict, Optional
+from core.config import Config
+from core.builtin_rewrites import rewrite_command
+
+# Expressions that cost nothing to repeat: numbers, quoted literals, $VAR, "$VAR"
+SIMPLE_EXPRESSION_REGEX = re.compile(r'^(-?\d+|"[^"$`\\]*"|(\$\w+|\$\{\w+\})|"(\$\w+|\$\{\w+\})")$')
+VARIABLE_REFERENCE_REGEX = re.compile(r"\$\{?(\w+)")
+IDENTIFIER_REGEX = re.compile(r"[A-Za-z_]\w*")
+
+def referenced_names(expression: str) -> set:
+    names = set(VARIABLE_REFERENCE_REGEX.findall(expression))
+    if "((" in expression:
+        # Bare names are variables in arithmetic, every identifier counts (over-approximation)
+        names.update(IDENTIFIER_REGEX.findall(expression))
+    return names
 
 class BashContext:
-    def __init__(self):
+    def __init__(self, track_fragments=False, hoist_values=None, optimize=None, profile=False, prefer_builtins=None):
         self.variables: Dict[str, str] = {}
         self.indent_level = 0
         self.lines: List[str] = []
         self.function_lines = []
+        # Shell functions shared by several nodes, emitted once before the user functions
+        self.helper_lines: List[str] = []
+        self._helpers = set()
         self.emitted_nodes = set()
         self._current_buffer = "main"
+        # node id -> (buffer, first line, last line + 1, indent, single_line), see record_fragment
+        self.track_fragments = track_fragments
+        self.fragments: Dict[str, tuple] = {}
+        # (node id, output port id, kind, inline) -> expression, see value_of / condition_of
+        self._values: Dict[tuple, Optional[str]] = {}
+        # Values read by several consumers are computed once into a temporary.
+        # Every block has a scope: {"isolated": bool, "temps": {(node id, port id, kind): (name, names read, reference)}},
+        # loop and function bodies are isolated, they don't see the temporaries from outside. An isolated
+        # scope also keeps the memo of the enclosing code ("values"), the body starts with an empty one:
+        # memoized expressions may refer to temporaries the body can't see.
+        # Optimizations (-O1): constant folding through BaseNode.constant_value, dead branches and
+        # no-op statements are left out by the nodes themselves
+        self.optimize = Config.OPTIMIZATION_LEVEL >= 1 if optimize is None else optimize
+        self._constants: Dict[tuple, object] = {}
+        if hoist_values is None:
+            hoist_values = Config.HOIST_VALUES and self.optimize
+        self.hoist_values = hoist_values
+        # Instrumented compile: every statement node reports its timings, see core.profiler
+        self.profile = profile
+        self.profile_closed = set()
+        # Builtins instead of external commands where the result is the same, see core.builtin_rewrites.
+        # Every rewrite is reported as (node id, before, after)
+        self.prefer_builtins = Config.PREFER_BUILTINS if prefer_builtins is None else prefer_builtins
+        self.rewrites: List[tuple] = []
+        # node id -> variable holding what a command node printed when it ran, see RunCommandNode
+        self.output_names: Dict[str, str] = {}
+        self._scopes = [{"isolated": True, "temps": {}}]
+        self._temp_count = 0
+        self._inline = 0
     
     def add_line(self, line: str):
         indent = "    " * self.indent_level
@@ -16,17 +64,190 @@ class BashContext:
         else:
             self.lines.append(f"{indent}{line}")
 
+    def value_of(self, port) -> Optional[str]:
+        # Value read from an output port, each value node is emitted once per compile
+        return self._read(port, "value", port.node.emit_bash_value)
+
+    def condition_of(self, port) -> Optional[str]:
+        return self._read(port, "condition", port.node.emit_condition)
+
+    def constant_of(self, port):
+        # Compile time value of an output port (int, str or bool), None when unknown
+        key = (port.node.id, port.id)
+        if key not in self._constants:
+            self._constants[key] = port.node.constant_value(self)
+        return self._constants[key]
+
+    @staticmethod
+    def literal(value, kind: str) -> str:
+        if kind == "condition":
+            return "true" if value else "false"
+        if isinstance(value, str):
+            return f'"{value}"'
+        return str(value)
+
+    def _read(self, port, kind: str, emit) -> Optional[str]:
+        if self.optimize:
+            constant = self.constant_of(port)
+            if constant is not None:
+                return self.literal(constant, kind)
+
+        key = (port.node.id, port.id, kind)
+        hoist = self.hoist_values and not self._inline and len(port.connected_edges) > 1
+        if hoist:
+            temp = self._find_temp(key)
+            if temp:
+                return temp
+
+        memo_key = key + (bool(self._inline),)
+        if memo_key not in self._values:
+            self._values[memo_key] = emit(self)
+        expression = self._values[memo_key]
+
+        if not hoist or not expression or SIMPLE_EXPRESSION_REGEX.match(expression):
+            return expression
+        return self._hoist(key, kind, expression)
+
+    def _find_temp(self, key) -> Optional[str]:
+        for scope in reversed(self._scopes):
+            if key in scope["temps"]:
+                return scope["temps"][key][2]
+            if scope["isolated"]:
+                return None
+        return None
+
+    def _hoist(self, key, kind: str, expression: str) -> str:
+        name = self.unique_name("c" if kind == "condition" else "v")
+        local = self.local_prefix()
+        if kind == "condition":
+            self.add_line(f"if {expression}; then {local}{name}=true; else {local}{name}=false; fi")
+        else:
+            self.add_line(f"{local}{name}={expression}")
+        # A quoted string stays quoted: it may hold spaces
+        reference = f'"${name}"' if expression.startswith('"') else f"${name}"
+        self._scopes[-1]["temps"][key] = (name, referenced_names(expression), reference)
+        return reference
+
+    def prefer_builtin(self, node, command: str) -> str:
+        if not self.prefer_builtins:
+            return command
+        rewritten, rewrites = rewrite_command(command)
+        for before, after in rewrites:
+            self.record_rewrite(node, before, after)
+        return rewritten
+
+    def record_rewrite(self, node, before: str, after: str) -> str:
+        self.rewrites.append((node.id, before, after))
+        return after
+
+    def unique_name(self, kind: str) -> str:
+        # Helper variables of the generated script, unique within a compile
+        self._temp_count += 1
+        return f"_vish_{kind}{self._temp_count}"
+
+    def output_name(self, node) -> str:
+        name = self.output_names.get(node.id)
+        if name is None:
+            name = self.output_names[node.id] = self.unique_name("o")
+        return name
+
+    def local_prefix(self) -> str:
+        return "local " if self._current_buffer == "function" else ""
+
+    @contextmanager
+    def inline_values(self):
+        # For expressions that are evaluated more than once at run time (while conditions):
+        # no temporaries are created or read
+        self._inline += 1
+        try:
+            yield
+        finally:
+            self._inline -= 1
+
+    def set_variable(self, name: str, value: str = ""):
+        self.variables[name] = value
+        self._drop_temps({name})
+
+    def statement_done(self, node):
+        # Anything may have changed after a statement with side effects (a command, a call...)
+        if not getattr(node, "pure", False):
+            self._drop_temps(None)
+
+    def _drop_temps(self, changed):
+        # Drops the temporaries reading one of the changed names (all of them when None), then
+        # the ones built from a dropped temporary, until nothing else depends on them
+        dropped = False
+        while changed is None or changed:
+            stale = set()
+            for scope in self._scopes:
+                for key, (name, names, _) in list(scope["temps"].items()):
+                    if changed is None or names & changed:
+                        del scope["temps"][key]
+                        stale.add(name)
+            dropped = dropped or bool(stale)
+            changed = stale
+        if dropped:
+            # Memoized expressions may refer to the dropped temporaries
+            self._values.clear()
+            for scope in self._scopes:
+                if "values" in scope:
+                    scope["values"].clear()
+
+    def truncate(self, mark):
+        # Drops what was emitted in the current buffer since mark (a block that ended up empty)
+        buffer, start = mark[0], mark[1]
+        del self._buffer_lines(buffer)[start:]
+
+    def require_helper(self, name: str, lines: List[str]):
+        if name in self._helpers:
+            return
+        self._helpers.add(name)
+        self.helper_lines.extend(lines + [""])
+
     def add_function_line(self, line: str):
         self.function_lines.append(line)
 
+    def _buffer_lines(self, buffer: str) -> List[str]:
+        return self.function_lines if buffer == "function" else self.lines
+
+    def mark(self):
+        buffer = self._current_buffer
+        return (buffer, len(self._buffer_lines(buffer)), len(self.emitted_nodes), self.indent_level)
+
+    def record_fragment(self, node, mark, bash: str, lines_before_return: int):
+        # A fragment is "single line" when the node only returned one line of bash and
+        # emitted nothing else (no nested chain, no extra lines): it can be re-emitted alone.
+        if not self.track_fragments:
+            return
+        buffer, start, emitted, indent = mark
+        end = len(self._buffer_lines(buffer))
+        single_line = (
+            bool(bash)
+            and "\n" not in bash
+            and lines_before_return == start
+            and end == start + 1
+            and len(self.emitted_nodes) == emitted
+        )
+        self.fragments[node.id] = (buffer, start, end, indent, single_line)
+
     def build(self) -> str:
-        return "\n".join(self.function_lines + [""] + self.lines)
+        return "\n".join(self.helper_lines + self.function_lines + [""] + self.lines)
     
-    def indent(self):
+    def indent(self, isolated=False):
         self.indent_level += 1
+        scope = {"isolated": isolated, "temps": {}}
+        if isolated:
+            scope["values"], self._values = self._values, {}
+        self._scopes.append(scope)
     
     def dedent(self):
         self.indent_level = max(0, self.indent_level - 1)
+        if len(self._scopes) > 1:
+            scope = self._scopes.pop()
+            if "values" in scope:
+                self._values = scope["values"]
+            elif scope["temps"]:
+                self._values.clear()
     
     def get_script(self) -> str:
-        return "\n".join(self.function_lines + [""] + self.lines)
+        return "\n".join(self.helper_lines + self.function_lines + [""] + self.lines)
@@ -1,15 +1,19 @@
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
 from core.graph import Graph
+from core.port_types import PortType
 from nodes.base_node import BaseNode
 from core.bash_context import BashContext
 from core.config import Config
 
 class BashEmitter:
-    def __init__(self, graph: Graph):
+    def __init__(self, graph: Graph, profile=False):
         self.graph = graph
+        self.profile = profile
+        # (node id, before, after) for every builtin rewrite of the last emit, see BashContext.prefer_builtin
+        self.rewrites: List[tuple] = []
 
-    def emit(self) -> str:
-        context = BashContext()
-
+    def header(self) -> List[str]:
         header = [
             "#!/bin/bash/env bash",
             "",
@@ -18,14 +22,196 @@ class BashEmitter:
         ]
         if Config.CUSTOM_SHEBANG:
             header[0] = Config.CUSTOM_SHEBANG
+        return header
+
+    def emit_into(self, context: BashContext):
+        if context.profile:
+            from core.profiler import profile_setup
+            context.add_line(profile_setup())
         for node in self.graph.nodes.values():
             if node.node_type == "function":
                 if node.id in context.emitted_nodes:
                     continue
                 context.emitted_nodes.add(node.id)
+                mark = context.mark()
                 node.emit_bash(context)
+                context.record_fragment(node, mark, "", mark[1])
         start_node = self.graph.get_start_node()
         if start_node and start_node.outputs and start_node.outputs[0].connected_edges:
             first = start_node.outputs[0].connected_edges[0].target.node
             BaseNode.emit_exec_chain(first, context)
-        return "\n".join(header) + context.get_script()
+
+    def emit(self) -> str:
+        context = BashContext(profile=self.profile)
+        self.emit_into(context)
+        self.rewrites = context.rewrites
+        return "\n".join(self.header()) + context.get_script()
+
+
+class IncrementalBashEmitter(BashEmitter):
+    # Keeps the last generated script and, for every node, where its lines are.
+    # update() then only re-emits the single-line nodes touched since the last call
+    # (Graph.dirty_nodes and everything reading from them) and returns line patches.
+    # Anything else (exec flow changes, multi-line nodes, shebang) falls back to emit().
+    def __init__(self, graph: Graph):
+        super().__init__(graph)
+        self.lines: List[str] = []
+        self._header: Optional[List[str]] = None
+        self._version: Optional[int] = None
+        # node id -> (buffer, script line, indent) for single-line nodes, None for the others
+        self._fragments: Dict[str, Optional[Tuple[str, int, int]]] = {}
+        # node id -> ids of the emitted nodes whose output depends on it
+        self._dependents: Dict[str, Set[str]] = defaultdict(set)
+        # Variable names given to command outputs (BashContext.output_names), patches reuse them
+        self._output_names: Dict[str, str] = {}
+        # Settings of the last full emit, patches are emitted with the same ones
+        self.prefer_builtins = Config.PREFER_BUILTINS
+
+    @property
+    def script(self) -> str:
+        return "\n".join(self.lines)
+
+    def emit(self) -> str:
+        context = BashContext(track_fragments=True, profile=self.profile)
+        header = self.header()
+        self.emit_into(context)
+        self.rewrites = context.rewrites
+        self._output_names = context.output_names
+        self.prefer_builtins = context.prefer_builtins
+
+        self._header = header
+        self._version = self.graph.structure_version
+        self.graph.dirty_nodes.clear()
+
+        script = "\n".join(header) + context.get_script()
+        self.lines = script.split("\n")
+
+        header_lines = "\n".join(header).count("\n")
+        offsets = {
+            "function": self._line_offsets(context.function_lines, header_lines + len(context.helper_lines)),
+        }
+        offsets["main"] = self._line_offsets(context.lines, offsets["function"][-1] + 1)
+
+        self._fragments.clear()
+        self._dependents.clear()
+        for node_id, (buffer, start, end, indent, single_line) in context.fragments.items():
+            self._fragments[node_id] = (buffer, offsets[buffer][start], indent) if single_line else None
+            node = self.graph.nodes.get(node_id)
+            if node is None:
+                continue
+            self._dependents[node_id].add(node_id)
+            for source_id in self._data_sources(node):
+                self._dependents[source_id].add(node_id)
+
+        return script
+
+    def update(self, allow_full=True) -> Optional[List[Tuple[int, str]]]:
+        # Returns (line, text) patches, or None when only a full regeneration can bring the
+        # script up to date. That one is done right away unless allow_full is False.
+        result = self._patches()
+        if result is None:
+            if allow_full:
+                self.emit()
+            return None
+
+        patches, rewrites = result
+        self.graph.dirty_nodes.clear()
+        self._merge_rewrites(rewrites)
+        for line, text in patches:
+            self.lines[line] = text
+        return patches
+
+    def adopt(self, other: 'IncrementalBashEmitter'):
+        # Takes over the state of an emitter that ran on a snapshot of this graph
+        self.lines = other.lines
+        self._header = other._header
+        self._version = other._version
+        self._fragments = other._fragments
+        self._dependents = other._dependents
+        self.rewrites = other.rewrites
+        self._output_names = other._output_names
+        self.prefer_builtins = other.prefer_builtins
+
+    def _patches(self) -> Optional[Tuple[List[Tuple[int, str]], Dict[str, List[tuple]]]]:
+        # (line patches, node id -> builtin rewrites of the re-emitted nodes)
+        if (
+            self._version != self.graph.structure_version
+            or self._header != self.header()
+            or self.prefer_builtins != Config.PREFER_BUILTINS
+        ):
+            return None
+
+        affected = set()
+        for node_id in self.graph.dirty_nodes:
+            affected |= self._dependents.get(node_id, set())
+
+        patches = []
+        rewrites = {}
+        for node_id in affected:
+            fragment = self._fragments.get(node_id)
+            node = self.graph.nodes.get(node_id)
+            if fragment is None or node is None:
+                return None
+
+            buffer, line, indent = fragment
+            context = BashContext(profile=self.profile, prefer_builtins=self.prefer_builtins)
+            context.output_names = dict(self._output_names)
+            context._current_buffer = buffer
+            context.indent_level = indent
+            bash = node.emit_bash(context)
+            if not bash or "\n" in bash or context.lines or context.function_lines or context.helper_lines:
+                return None
+            context.add_line(bash)
+            text = context._buffer_lines(buffer)[0]
+
+            if text != self.lines[line]:
+                patches.append((line, text))
+            # A value node read by several patched nodes reports the same rewrites each time
+            emitted = {node_id: []}
+            for rewrite in context.rewrites:
+                emitted.setdefault(rewrite[0], []).append(rewrite)
+            for emitted_id, node_rewrites in emitted.items():
+                rewrites.setdefault(emitted_id, node_rewrites)
+
+        patches.sort()
+        return patches, rewrites
+
+    def _merge_rewrites(self, patched: Dict[str, List[tuple]]):
+        # The rewrites of re-emitted nodes take the place of their old ones
+        merged = []
+        placed = set()
+        for rewrite in self.rewrites:
+            node_id = rewrite[0]
+            if node_id not in patched:
+                merged.append(rewrite)
+            elif node_id not in placed:
+                placed.add(node_id)
+                merged += patched[node_id]
+        for node_id, rewrites in patched.items():
+            if node_id not in placed:
+                merged += rewrites
+        self.rewrites = merged
+
+    @staticmethod
+    def _line_offsets(buffer_lines: List[str], first_line: int) -> List[int]:
+        # buffer entry index -> script line, an entry can hold several physical lines
+        offsets = [first_line]
+        for entry in buffer_lines:
+            offsets.append(offsets[-1] + entry.count("\n") + 1)
+        return offsets
+
+    @staticmethod
+    def _data_sources(node) -> Set[str]:
+        sources = set()
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            for port in current.inputs:
+                if port.port_type == PortType.EXEC:
+                    continue
+                for edge in port.connected_edges:
+                    source = edge.source.node
+                    if source.id not in sources:
+                        sources.add(source.id)
+                        stack.append(source)
+        return sources
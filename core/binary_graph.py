@@ -0,0 +1,363 @@
+import json
+import mmap
+import struct
+import sys
+import uuid
+from array import array
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# Compact project format (graph.vishb). Same content as graph.json, but stored as
+# columns instead of one object per node:
+#   header   magic, format version, byte order, column count
+#   columns  (name, typecode, count, offset) for every column, data aligned on 8 bytes
+# Every string (ids, types, titles, property keys/values, ...) lives once in a
+# string table and is referenced by index. Ports and edges have no ids in the file,
+# an edge stores the global indexes of its two ports. The reader memory-maps the file
+# and only decodes what is asked for.
+
+BINARY_SUFFIX = ".vishb"
+MAGIC = b"VISHGRPH"
+FORMAT_VERSION = 1
+
+_HEADER = struct.Struct("<8sIBxxxI")
+_COLUMN = struct.Struct("<8scxxxIQ")
+_ALIGN = 8
+_TYPECODES = "bBhHiIlLqQfd"
+
+# property value kinds
+_STR, _INT, _FLOAT, _BOOL, _JSON = range(5)
+# port directions
+_INPUT, _OUTPUT = 0, 1
+
+_COLUMNS = {
+    # string table: utf-8 blob + offsets (count + 1)
+    "strings": "B", "str_off": "I",
+    # version string, comments (json)
+    "meta": "I",
+    "node_id": "I", "node_typ": "I", "node_tit": "I",
+    "node_x": "d", "node_y": "d",
+    "prop_beg": "I", "port_beg": "I",
+    "prop_key": "I", "prop_knd": "B", "prop_val": "q",
+    "port_dir": "B", "port_nam": "I", "port_typ": "I",
+    "edge_src": "I", "edge_tgt": "I",
+}
+
+
+def is_binary_graph(path) -> bool:
+    return Path(path).suffix == BINARY_SUFFIX
+
+
+class _StringTable:
+    def __init__(self):
+        self.index: Dict[str, int] = {}
+        self.blob = bytearray()
+        self.offsets = array("I", [0])
+
+    def add(self, text: str) -> int:
+        idx = self.index.get(text)
+        if idx is None:
+            idx = self.index[text] = len(self.offsets) - 1
+            self.blob += text.encode("utf-8")
+            self.offsets.append(len(self.blob))
+        return idx
+
+
+def _encode_value(value, strings: _StringTable) -> Tuple[int, int]:
+    if isinstance(value, bool):
+        return _BOOL, int(value)
+    if isinstance(value, int) and -2**63 <= value < 2**63:
+        return _INT, value
+    if isinstance(value, float):
+        return _FLOAT, struct.unpack("<q", struct.pack("<d", value))[0]
+    if isinstance(value, str):
+        return _STR, strings.add(value)
+    return _JSON, strings.add(json.dumps(value))
+
+
+def pack_graph_data(data: dict) -> bytes:
+    # data is what Serializer.to_data() returns (the graph.json content)
+    strings = _StringTable()
+    cols = {name: array(code) for name, code in _COLUMNS.items()}
+    cols["meta"].extend([
+        strings.add(data.get("version", "")),
+        strings.add(json.dumps(data.get("comments", []))),
+    ])
+
+    port_index: Dict[str, int] = {}
+    cols["prop_beg"].append(0)
+    cols["port_beg"].append(0)
+    for node in data["nodes"]:
+        cols["node_id"].append(strings.add(node["id"]))
+        cols["node_typ"].append(strings.add(node["type"]))
+        cols["node_tit"].append(strings.add(node.get("title", "")))
+        cols["node_x"].append(float(node.get("x", 0)))
+        cols["node_y"].append(float(node.get("y", 0)))
+
+        for key, value in node.get("properties", {}).items():
+            kind, raw = _encode_value(value, strings)
+            cols["prop_key"].append(strings.add(key))
+            cols["prop_knd"].append(kind)
+            cols["prop_val"].append(raw)
+        cols["prop_beg"].append(len(cols["prop_key"]))
+
+        for direction, ports in ((_INPUT, node.get("inputs", [])), (_OUTPUT, node.get("outputs", []))):
+            for port in ports:
+                port_index[port["id"]] = len(cols["port_dir"])
+                cols["port_dir"].append(direction)
+                cols["port_nam"].append(strings.add(port.get("name", "")))
+                cols["port_typ"].append(strings.add(port.get("type", "")))
+        cols["port_beg"].append(len(cols["port_dir"]))
+
+    for edge in data["edges"]:
+        source = port_index.get(edge["source"])
+        target = port_index.get(edge["target"])
+        if source is not None and target is not None:
+            cols["edge_src"].append(source)
+            cols["edge_tgt"].append(target)
+
+    cols["strings"].frombytes(bytes(strings.blob))
+    cols["str_off"] = strings.offsets
+    return _write_columns(cols)
+
+
+def _write_columns(cols: Dict[str, array]) -> bytes:
+    table_size = _HEADER.size + _COLUMN.size * len(cols)
+    offset = _aligned(table_size)
+    header = bytearray(_HEADER.pack(MAGIC, FORMAT_VERSION, sys.byteorder == "big", len(cols)))
+    body = bytearray()
+    for name, column in cols.items():
+        header += _COLUMN.pack(name.encode("ascii"), column.typecode.encode("ascii"), len(column), offset + len(body))
+        body += column.tobytes()
+        body += b"\0" * (_aligned(len(body)) - len(body))
+    header += b"\0" * (offset - len(header))
+    return bytes(header + body)
+
+
+def _aligned(size: int) -> int:
+    return (size + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+class BinaryGraphReader:
+    # Columns are memoryviews over the mapped file, nothing is decoded until it is used
+    def __init__(self, buffer):
+        self._buffer = buffer
+        self._file = None
+        self._strings: Dict[int, str] = {}
+
+        # A truncated or corrupt file is a ValueError, like a broken graph.json
+        if len(buffer) < _HEADER.size:
+            raise ValueError("Truncated binary graph: the header is missing")
+        magic, version, big_endian, count = _HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise ValueError("Not a Vish binary graph")
+        if version > FORMAT_VERSION:
+            raise ValueError(f"Unsupported binary graph version: {version}")
+        if _HEADER.size + count * _COLUMN.size > len(buffer):
+            raise ValueError("Truncated binary graph: the column table is incomplete")
+
+        view = memoryview(buffer)
+        swap = bool(big_endian) != (sys.byteorder == "big")
+        self.columns = {}
+        for i in range(count):
+            name, code, length, offset = _COLUMN.unpack_from(buffer, _HEADER.size + i * _COLUMN.size)
+            try:
+                name, code = name.rstrip(b"\0").decode("ascii"), code.decode("ascii")
+            except UnicodeDecodeError:
+                raise ValueError(f"Corrupt binary graph: column {i} has an invalid name or type")
+            if _COLUMNS.get(name, code) != code or code not in _TYPECODES:
+                raise ValueError(f"Corrupt binary graph: column {name} has type {code!r}")
+            size = length * array(code).itemsize
+            if offset + size > len(buffer):
+                raise ValueError(f"Truncated binary graph: column {name} ends past the end of the file")
+            if swap:
+                # Written on a machine with the other byte order: copy instead of mapping
+                column = array(code, bytes(view[offset:offset + size]))
+                column.byteswap()
+                self.columns[name] = column
+            else:
+                self.columns[name] = view[offset:offset + size].cast(code)
+        self._check_columns()
+
+    def _check_columns(self):
+        # Column lengths and the indexes between columns, what decoding relies on
+        cols = self.columns
+        missing = [name for name in _COLUMNS if name not in cols]
+        if missing:
+            raise ValueError(f"Corrupt binary graph: missing columns {', '.join(missing)}")
+        nodes = len(cols["node_id"])
+        groups = (
+            ("node_id", "node_typ", "node_tit", "node_x", "node_y"),
+            ("prop_key", "prop_knd", "prop_val"),
+            ("port_dir", "port_nam", "port_typ"),
+            ("edge_src", "edge_tgt"),
+        )
+        consistent = (
+            all(len({len(cols[name]) for name in group}) == 1 for group in groups)
+            and len(cols["prop_beg"]) == nodes + 1 and len(cols["port_beg"]) == nodes + 1
+            and max(cols["prop_beg"]) <= len(cols["prop_key"])
+            and max(cols["port_beg"]) <= len(cols["port_dir"])
+            and max(cols["edge_src"], default=-1) < len(cols["port_dir"])
+            and max(cols["edge_tgt"], default=-1) < len(cols["port_dir"])
+            and len(cols["meta"]) >= 2
+            and len(cols["str_off"]) >= 1 and cols["str_off"][-1] <= len(cols["strings"])
+        )
+        if not consistent:
+            raise ValueError("Corrupt binary graph: inconsistent columns")
+
+    @classmethod
+    def open(cls, path) -> 'BinaryGraphReader':
+        handle = open(path, "rb")
+        try:
+            mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            handle.close()
+            raise
+        reader = cls(mapped)
+        reader._file = handle
+        return reader
+
+    def close(self):
+        # The casted views have to go before the map can be closed
+        self.columns = {}
+        if self._file is not None:
+            self._buffer.close()
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def string(self, index: int) -> str:
+        text = self._strings.get(index)
+        if text is None:
+            offsets = self.columns["str_off"]
+            if not 0 <= index < len(offsets) - 1:
+                raise ValueError(f"Corrupt binary graph: string {index} is out of range")
+            text = bytes(self.columns["strings"][offsets[index]:offsets[index + 1]]).decode("utf-8")
+            self._strings[index] = text
+        return text
+
+    @property
+    def version(self) -> str:
+        return self.string(self.columns["meta"][0])
+
+    @property
+    def node_count(self) -> int:
+        return len(self.columns["node_id"])
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.columns["edge_src"])
+
+    def comments(self) -> list:
+        return json.loads(self.string(self.columns["meta"][1]))
+
+    def node_id(self, i: int) -> str:
+        return self.string(self.columns["node_id"][i])
+
+    def node_type(self, i: int) -> str:
+        return self.string(self.columns["node_typ"][i])
+
+    def node_types(self) -> List[str]:
+        return [self.string(t) for t in set(self.columns["node_typ"])]
+
+    def properties(self, i: int) -> dict:
+        cols = self.columns
+        props = {}
+        for p in range(cols["prop_beg"][i], cols["prop_beg"][i + 1]):
+            kind, raw = cols["prop_knd"][p], cols["prop_val"][p]
+            if kind == _STR:
+                value = self.string(raw)
+            elif kind == _INT:
+                value = raw
+            elif kind == _FLOAT:
+                value = struct.unpack("<d", struct.pack("<q", raw))[0]
+            elif kind == _BOOL:
+                value = bool(raw)
+            else:
+                value = json.loads(self.string(raw))
+            props[self.string(cols["prop_key"][p])] = value
+        return props
+
+    def ports(self, i: int) -> Tuple[range, range]:
+        # Global indexes of the input and output ports of node i
+        cols = self.columns
+        start, end = cols["port_beg"][i], cols["port_beg"][i + 1]
+        split = start
+        while split < end and cols["port_dir"][split] == _INPUT:
+            split += 1
+        return range(start, split), range(split, end)
+
+    def to_graph(self, node_factory):
+        # Builds the graph straight from the columns, like Serializer.from_data
+        from core.graph import Graph
+
+        cols = self.columns
+        graph = Graph()
+        ports = [None] * len(cols["port_dir"])
+        for i in range(self.node_count):
+            node_type = self.node_type(i)
+            node = node_factory.create_node(node_type)
+            if node is None:
+                raise ValueError((f"Unknown node type: {node_type}", node_type))
+
+            node.id = self.node_id(i)
+            node.title = self.string(cols["node_tit"][i])
+            node.x = cols["node_x"][i]
+            node.y = cols["node_y"][i]
+            node.properties = self.properties(i)
+            graph.add_node(node)
+
+            inputs, outputs = self.ports(i)
+            for index, port in zip(inputs, node.inputs):
+                ports[index] = port
+            for index, port in zip(outputs, node.outputs):
+                ports[index] = port
+
+        for source, target in zip(cols["edge_src"], cols["edge_tgt"]):
+            if ports[source] and ports[target]:
+                graph.add_edge(ports[source], ports[target])
+        return graph, self.comments()
+
+    def to_data(self) -> dict:
+        # graph.json content. Ports and edges get fresh ids, the file doesn't keep them
+        cols = self.columns
+        port_ids = [str(uuid.uuid4()) for _ in range(len(cols["port_dir"]))]
+        nodes = []
+        for i in range(self.node_count):
+            inputs, outputs = self.ports(i)
+            nodes.append({
+                "id": self.node_id(i),
+                "type": self.node_type(i),
+                "title": self.string(cols["node_tit"][i]),
+                "x": cols["node_x"][i],
+                "y": cols["node_y"][i],
+                "properties": self.properties(i),
+                "inputs": [self._port_data(p, port_ids) for p in inputs],
+                "outputs": [self._port_data(p, port_ids) for p in outputs],
+            })
+
+        edges = [
+            {"id": str(uuid.uuid4()), "source": port_ids[source], "target": port_ids[target]}
+            for source, target in zip(cols["edge_src"], cols["edge_tgt"])
+        ]
+        return {"version": self.version, "nodes": nodes, "edges": edges, "comments": self.comments()}
+
+    def _port_data(self, index: int, port_ids: List[str]) -> dict:
+        return {
+            "id": port_ids[index],
+            "name": self.string(self.columns["port_nam"][index]),
+            "type": self.string(self.columns["port_typ"][index]),
+        }
+
+
+def json_to_binary(json_str: str) -> bytes:
+    return pack_graph_data(json.loads(json_str))
+
+
+def binary_to_json(buffer) -> str:
+    return json.dumps(BinaryGraphReader(buffer).to_data(), indent=2)
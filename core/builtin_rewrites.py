@@ -0,0 +1,235 @@
+import re
+from typing import List, Optional, Tuple
+
+# Builtin-preferring emission (Config.PREFER_BUILTINS): command substitutions that fork an external
+# program are replaced by bash builtins or parameter expansion when the output is the same.
+#   $(cat FILE)               -> $(<FILE)          bash reads the file itself
+#   $(basename PATH [SUFFIX]) -> the name          PATH is a literal, computed at compile time
+#   $(dirname PATH)           -> the directory     same
+#   $(expr 1 + 2 \* 3)        -> 7                 integer literals, computed at compile time
+# Anything else (options, globs, redirections, pipes) is left as written. Test nodes emit [[ ]]
+# instead of [ ]: the operands are neither split nor globbed, the right side is quoted so that
+# == compares strings instead of matching a pattern.
+
+# One shell word that expands to exactly one word: quoted, or unquoted without expansions
+_SINGLE_QUOTED = r"'[^']*'"
+_DOUBLE_QUOTED = r'"[^"`\\]*"'
+_PLAIN_WORD = r"[^\s'\"`$*?\[\]<>|;&()\\-][^\s'\"`$*?\[\]<>|;&()\\]*"
+_FILE_WORD_REGEX = re.compile(rf"^(?:{_SINGLE_QUOTED}|{_DOUBLE_QUOTED}|{_PLAIN_WORD})$")
+CAT_REGEX = re.compile(r"^\s*cat\s+(\S+)\s*$")
+PATH_COMMAND_REGEX = re.compile(r"^\s*(basename|dirname)\s+(\S+)(?:\s+(\S+))?\s*$")
+EXPR_REGEX = re.compile(r"^\s*expr\s+(.+?)\s*$")
+# expr isn't replaced by $(( )): it exits with 1 when the result is 0, and $(( )) evaluates the
+# value of a variable as an expression where expr wants an integer. Only literals are folded.
+EXPR_OPERAND_REGEX = re.compile(r"^-?\d+$")
+EXPR_OPERATORS = {"+": "+", "-": "-", "\\*": "*", "'*'": "*", '"*"': "*", "/": "/", "%": "%"}
+EXPR_OPEN = ("\\(", "'('", '"("')
+EXPR_CLOSE = ("\\)", "')'", '")"')
+# expr's integers are 64 bits (without GMP), anything larger is left to expr
+EXPR_LIMIT = 2 ** 63
+# Output that reads the same quoted or not: no spaces, globs or quotes
+SAFE_LITERAL_REGEX = re.compile(r"^[A-Za-z0-9_./+:@%,=-]+$")
+QUOTED_OPERAND_REGEX = re.compile(r'^(-?\d+|"([^"\\]|\\.)*")$')
+
+
+def rewrite_command(command: str) -> Tuple[str, List[Tuple[str, str]]]:
+    # Returns the rewritten command and the (before, after) substitutions that were replaced
+    rewrites = []
+    parts = []
+    position = 0
+    for start, end in _substitutions(command):
+        original = command[start:end]
+        replacement = rewrite_substitution(original[2:-1])
+        if replacement is None:
+            continue
+        parts.append(command[position:start])
+        parts.append(replacement)
+        rewrites.append((original, replacement))
+        position = end
+    parts.append(command[position:])
+    return "".join(parts), rewrites
+
+
+def quote_operand(expression: str) -> str:
+    # Right side of == in [[ ]], so that it is compared as a string
+    return expression if QUOTED_OPERAND_REGEX.match(expression) else f'"{expression}"'
+
+
+def rewrite_substitution(inner: str) -> Optional[str]:
+    # inner is the command of a $(...) substitution
+    match = CAT_REGEX.match(inner)
+    if match and _FILE_WORD_REGEX.match(match.group(1)):
+        return f"$(<{match.group(1)})"
+
+    match = PATH_COMMAND_REGEX.match(inner)
+    if match:
+        command, path, suffix = match.groups()
+        path = _literal(path)
+        if path is None or (suffix is not None and command == "dirname"):
+            return None
+        if command == "dirname":
+            result = posix_dirname(path)
+        else:
+            suffix = "" if suffix is None else _literal(suffix)
+            if suffix is None:
+                return None
+            result = posix_basename(path, suffix)
+        return result if SAFE_LITERAL_REGEX.match(result) else None
+
+    match = EXPR_REGEX.match(inner)
+    if match:
+        return fold_expr(match.group(1).split())
+    return None
+
+
+def posix_basename(path: str, suffix: str = "") -> str:
+    if not path:
+        return ""
+    stripped = path.rstrip("/")
+    if not stripped:
+        return "/"
+    name = stripped.rsplit("/", 1)[-1]
+    if suffix and name != suffix and name.endswith(suffix):
+        name = name[:-len(suffix)]
+    return name
+
+
+def posix_dirname(path: str) -> str:
+    stripped = path.rstrip("/")
+    if not stripped:
+        return "/" if path else "."
+    if "/" not in stripped:
+        return "."
+    parent = stripped.rsplit("/", 1)[0].rstrip("/")
+    return parent or "/"
+
+
+def _literal(word: str) -> Optional[str]:
+    # Value of a word that has no expansions, None otherwise
+    if re.fullmatch(_SINGLE_QUOTED, word):
+        return word[1:-1]
+    if re.fullmatch(_DOUBLE_QUOTED, word) and "$" not in word:
+        return word[1:-1]
+    if re.fullmatch(_PLAIN_WORD, word):
+        return word
+    return None
+
+
+def fold_expr(tokens: List[str]) -> Optional[str]:
+    # What expr prints for integer literals and + - * / % with \( \) groups. None for anything
+    # else, and when expr would exit with a non-zero status (a 0 result, a division by zero, an
+    # overflow): the substitution's status would change
+    terms = []
+    for token in tokens:
+        if token in EXPR_OPEN:
+            terms.append("(")
+        elif token in EXPR_CLOSE:
+            terms.append(")")
+        elif token in EXPR_OPERATORS:
+            terms.append(EXPR_OPERATORS[token])
+        elif EXPR_OPERAND_REGEX.match(token):
+            terms.append(int(token))
+        else:
+            return None
+    try:
+        value, end = _expr_sum(terms, 0)
+    except (IndexError, ValueError, ZeroDivisionError):
+        return None
+    if end != len(terms) or value == 0:
+        return None
+    return str(value)
+
+
+def _checked(value: int) -> int:
+    if not -EXPR_LIMIT <= value < EXPR_LIMIT:
+        raise ValueError("out of range")
+    return value
+
+
+def _expr_sum(terms: list, i: int) -> Tuple[int, int]:
+    value, i = _expr_product(terms, i)
+    while i < len(terms) and terms[i] in ("+", "-"):
+        right, end = _expr_product(terms, i + 1)
+        value = _checked(value + right if terms[i] == "+" else value - right)
+        i = end
+    return value, i
+
+
+def _expr_product(terms: list, i: int) -> Tuple[int, int]:
+    value, i = _expr_operand(terms, i)
+    while i < len(terms) and terms[i] in ("*", "/", "%"):
+        right, end = _expr_operand(terms, i + 1)
+        if terms[i] == "*":
+            value = _checked(value * right)
+        else:
+            # Truncated towards zero, the remainder has the sign of the dividend (like C)
+            quotient = abs(value) // abs(right)
+            if (value < 0) != (right < 0):
+                quotient = -quotient
+            value = _checked(quotient if terms[i] == "/" else value - quotient * right)
+        i = end
+    return value, i
+
+
+def _expr_operand(terms: list, i: int) -> Tuple[int, int]:
+    term = terms[i]
+    if term == "(":
+        value, i = _expr_sum(terms, i + 1)
+        if terms[i] != ")":
+            raise ValueError("unbalanced parentheses")
+        return value, i + 1
+    if isinstance(term, str):
+        raise ValueError(f"unexpected {term}")
+    return _checked(term), i + 1
+
+
+def _substitutions(command: str) -> List[Tuple[int, int]]:
+    # (start, end) of the outermost $(...) in command, skipping $((...)), quotes and escapes
+    found = []
+    i = 0
+    in_double = False
+    while i < len(command):
+        char = command[i]
+        if char == "\\":
+            i += 2
+            continue
+        if char == "'" and not in_double:
+            end = command.find("'", i + 1)
+            if end < 0:
+                break
+            i = end + 1
+            continue
+        if char == '"':
+            in_double = not in_double
+        elif command.startswith("$(", i) and not command.startswith("$((", i):
+            end = _closing_paren(command, i + 2)
+            if end < 0:
+                break
+            found.append((i, end + 1))
+            i = end + 1
+            continue
+        i += 1
+    return found
+
+
+def _closing_paren(command: str, i: int) -> int:
+    depth = 1
+    quote = None
+    while i < len(command):
+        char = command[i]
+        if char == "\\" and quote != "'":
+            i += 2
+            continue
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in "'\"":
+            quote = char
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+            if depth == 0:
+                return i
+        i += 1
+    return -1
@@ -0,0 +1,251 @@
+# Headless entry points: `vish compile ...` and `vish convert ...`
+# Everything imported here must stay Qt-free so graphs can be compiled in CI
+# on machines that don't have PySide6 installed.
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from core.bash_emitter import BashEmitter
+from core.binary_graph import BINARY_SUFFIX, binary_to_json, is_binary_graph, json_to_binary
+from core.config import Config
+from core.serializer import Serializer
+from nodes.registry import NodeFactory
+from nodes import flow_nodes, command_nodes, variable_nodes, operation_nodes, utils_node # registers the node types
+from nodes.packs import load_node_packs
+
+# At import time so that spawned worker processes know the pack node types too
+load_node_packs()
+
+
+def resolve_graph_path(path: Path) -> Path:
+    if path.is_dir():
+        project_file = path / "project.json"
+        if project_file.exists():
+            return resolve_graph_path(project_file)
+        return path / "graph.json"
+
+    if path.name == "project.json":
+        project_data = json.loads(path.read_text())
+        return path.parent / project_data.get("graph_file", "graph.json")
+
+    return path
+
+
+def compile_graph(json_data: str) -> str:
+    graph, _ = Serializer.deserialize(json_data, NodeFactory())
+    return BashEmitter(graph).emit()
+
+
+def compile_file(path: Path, profile=False, rewrites=None) -> str:
+    # rewrites, when given, receives a description of every builtin rewrite (Config.PREFER_BUILTINS)
+    graph, _ = Serializer.load(resolve_graph_path(path), NodeFactory())
+    emitter = BashEmitter(graph, profile=profile)
+    script = emitter.emit()
+    if rewrites is not None:
+        for node_id, before, after in emitter.rewrites:
+            node = graph.nodes.get(node_id)
+            rewrites.append(f"{node.title if node else node_id}: {before} -> {after}")
+    return script
+
+
+def _compile_job(source: str, target: str | None, shebang: str, optimization_level: int, profile: bool, prefer_builtins: bool):
+    # Runs in a worker process, so the settings have to be passed explicitly
+    Config.CUSTOM_SHEBANG = shebang
+    Config.OPTIMIZATION_LEVEL = optimization_level
+    Config.PREFER_BUILTINS = prefer_builtins
+    start = time.perf_counter()
+    rewrites = []
+    try:
+        script = compile_file(Path(source), profile, rewrites)
+        if target:
+            Path(target).parent.mkdir(parents=True, exist_ok=True)
+            Path(target).write_text(script)
+            script = None
+    except ValueError as e:
+        # Serializer reports unknown node types as (message, node_type)
+        message = e.args[0][0] if e.args and isinstance(e.args[0], tuple) else str(e)
+        return source, target, time.perf_counter() - start, message, None, []
+    except Exception as e:
+        return source, target, time.perf_counter() - start, str(e), None, []
+    return source, target, time.perf_counter() - start, None, script, rewrites
+
+
+def _output_target(source: Path, output: str | None, batch: bool) -> str | None:
+    if not batch:
+        if output in (None, "-"):
+            return None
+        return output
+
+    if output:
+        name = source.parent.name if source.is_file() else source.name
+        return str(Path(output) / f"{name or source.stem}.sh")
+
+    graph_path = resolve_graph_path(source)
+    return str(graph_path.with_suffix(".sh"))
+
+
+def _drop_colliding_targets(tasks):
+    # a/proj and b/proj both map to DIR/proj.sh with -o DIR: only the first one is
+    # compiled, the others are reported as failed instead of overwriting it
+    owners = {}
+    kept, failed = [], []
+    for task in tasks:
+        source, target = task[0], task[1]
+        key = str(Path(target).resolve()) if target else None
+        if key is not None and key in owners:
+            failed.append((source, target, 0.0, f"output {target} is already written by {owners[key]}", None, []))
+            continue
+        owners[key] = source
+        kept.append(task)
+    return kept, failed
+
+
+def _executor(jobs: int) -> ProcessPoolExecutor:
+    # Prefer fork: with spawn, workers would re-import main.py and pull in Qt
+    if "fork" in multiprocessing.get_all_start_methods():
+        return ProcessPoolExecutor(max_workers=jobs, mp_context=multiprocessing.get_context("fork"))
+    return ProcessPoolExecutor(max_workers=jobs)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="vish compile",
+        description="Compile Vish projects (project.json / graph.json / graph.vishb) to bash without starting the editor."
+    )
+    parser.add_argument("inputs", nargs="+", help="Project directories, project.json or graph files")
+    parser.add_argument(
+        "-o", "--output",
+        help="Output file for a single input ('-' for stdout, the default), "
+             "or output directory when compiling several inputs"
+    )
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=1,
+        help="Number of worker processes (0 = one per CPU)"
+    )
+    parser.add_argument(
+        "--shebang", default=Config.CUSTOM_SHEBANG,
+        help=f"Shebang line of the generated scripts (default: {Config.CUSTOM_SHEBANG})"
+    )
+    parser.add_argument(
+        "-O", dest="optimization_level", type=int, choices=(0, 1), default=Config.OPTIMIZATION_LEVEL,
+        help="0: emit the graph as is, 1: fold constants, drop dead branches, empty loops and "
+             f"no-ops (default: {Config.OPTIMIZATION_LEVEL})"
+    )
+    parser.add_argument(
+        "--profile", action="store_true",
+        help="Instrument the scripts: run them with VISH_PROFILE=<file> to record per-node timings"
+    )
+    parser.add_argument(
+        "--prefer-builtins", action="store_true", default=Config.PREFER_BUILTINS,
+        help="Replace external commands by bash builtins where the result is the same "
+             "($(cat f), basename, dirname, expr, [ ]) and list each rewrite"
+    )
+    parser.add_argument("-q", "--quiet", action="store_true", help="Don't print per-project timings")
+    return parser
+
+
+def compile_main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    batch = len(args.inputs) > 1
+    tasks = [
+        (source, _output_target(Path(source), args.output, batch), args.shebang, args.optimization_level, args.profile, args.prefer_builtins)
+        for source in args.inputs
+    ]
+    tasks, results = _drop_colliding_targets(tasks)
+
+    start = time.perf_counter()
+    if jobs > 1 and len(tasks) > 1:
+        with _executor(min(jobs, len(tasks))) as pool:
+            results += list(pool.map(_compile_job, *zip(*tasks)))
+    elif tasks:
+        results += [_compile_job(*task) for task in tasks]
+    total = time.perf_counter() - start
+
+    failures = 0
+    for source, target, elapsed, error, script, rewrites in results:
+        if error:
+            failures += 1
+            print(f"[ERROR] {source}: {error}", file=sys.stderr)
+            continue
+        if script is not None:
+            sys.stdout.write(script + "\n")
+        if not args.quiet:
+            print(f"{elapsed * 1000:9.1f} ms  {source} -> {target or 'stdout'}", file=sys.stderr)
+            for rewrite in rewrites:
+                print(f"             builtin  {rewrite}", file=sys.stderr)
+
+    if not args.quiet:
+        print(
+            f"Compiled {len(results) - failures}/{len(results)} project(s) in {total:.2f}s using {jobs if batch else 1} job(s)",
+            file=sys.stderr
+        )
+
+    return 1 if failures else 0
+
+
+def convert_graph(source: Path, target: Path):
+    if is_binary_graph(source):
+        target.write_text(binary_to_json(source.read_bytes()))
+    else:
+        target.write_bytes(json_to_binary(source.read_text()))
+
+
+def build_convert_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="vish convert",
+        description="Convert a graph between JSON (graph.json) and the compact binary format (graph.vishb). "
+                    "When given a project, its project.json is switched to the converted file."
+    )
+    parser.add_argument("input", help="Project directory, project.json or graph file")
+    parser.add_argument("-o", "--output", help="Output graph file (default: next to the input, with the other extension)")
+    return parser
+
+
+def convert_main(argv=None) -> int:
+    args = build_convert_parser().parse_args(argv)
+    source = Path(args.input)
+    graph_path = resolve_graph_path(source)
+    if args.output:
+        target = Path(args.output)
+    else:
+        target = graph_path.with_suffix(".json" if is_binary_graph(graph_path) else BINARY_SUFFIX)
+
+    try:
+        convert_graph(graph_path, target)
+    except (OSError, ValueError) as e:
+        print(f"[ERROR] {graph_path}: {e}", file=sys.stderr)
+        return 1
+
+    project_file = source / "project.json" if source.is_dir() else source
+    if project_file.name == "project.json" and project_file.exists() and target.parent.resolve() == project_file.parent.resolve():
+        project_data = json.loads(project_file.read_text())
+        project_data["graph_file"] = target.name
+        project_file.write_text(json.dumps(project_data, indent=4))
+
+    print(f"{graph_path} -> {target}", file=sys.stderr)
+    return 0
+
+
+COMMANDS = {
+    "compile": compile_main,
+    "convert": convert_main,
+}
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] not in COMMANDS:
+        print(f"usage: vish {{{','.join(COMMANDS)}}} ...", file=sys.stderr)
+        return 2
+    return COMMANDS[argv[0]](argv[1:])
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,6 +7,13 @@ class Config:
     USING_TTY = True
     SYNC_NODES_AND_GEN = False
     AUTO_SAVE = False
+    INCREMENTAL_GEN = True
+    RUN_SCROLLBACK = 10000 # lines kept in the run panel, 0 = unlimited
+    OPTIMIZATION_LEVEL = 1 # 0: emit the graph as is, 1: fold constants, drop dead code, hoist shared values
+    HOIST_VALUES = True # compute values used several times once, into a temporary variable
+    PREFER_BUILTINS = False # rewrite $(cat f), basename, dirname, expr and [ ] to bash builtins when the result is the same
+    LOD_DETAIL = 0.45 # below this zoom, nodes are plain boxes without title, icon and ports
+    LOD_STRAIGHT_EDGES = 0.3 # below this zoom, edges are straight lines
     lang = "en"
     theme = "dark"
     CUSTOM_SHEBANG = "#!/usr/bin/env bash"
@@ -2,24 +2,26 @@ import os
 from pathlib import Path
 import platform
 import sys
-from ui.info import MessageWidget
-from PySide6.QtCore import QStandardPaths
 
 class Debug:
     _parent = None
+    _dispatcher = None
 
     @staticmethod
     def init(parent):
+        from ui.info import MessageDispatcher
         Debug._parent = parent
+        Debug._dispatcher = MessageDispatcher(parent)
 
     @staticmethod
     def _show(message: str, level: str):
         if not Debug._parent:
-            print(f"[{level.upper()}] {message}")
+            # Headless: stdout may be the generated script
+            print(f"[{level.upper()}] {message}", file=sys.stderr)
             return
 
-        toast = MessageWidget(Debug._parent, message, level)
-        toast.show_animated()
+        # Goes through a signal so that messages from the generation thread are shown on the GUI thread
+        Debug._dispatcher.message.emit(message, level)
 
     @staticmethod
     def Error(message: str):
@@ -34,13 +36,18 @@ class Debug:
         Debug._show(message, "info")
 
 class Info:
-    CONFIG_PATH = os.path.join(QStandardPaths.writableLocation(QStandardPaths.AppConfigLocation), "config.json")
+    CONFIG_PATH = None
+
     @staticmethod
     def get_os():
         return platform.system()
     
     @staticmethod
     def get_config_path():
+        if Info.CONFIG_PATH is None:
+            # Resolved on first use so that compiling graphs never has to import Qt
+            from PySide6.QtCore import QStandardPaths
+            Info.CONFIG_PATH = os.path.join(QStandardPaths.writableLocation(QStandardPaths.AppConfigLocation), "config.json")
         Info.ensure_config_dir_exists()
         return Info.CONFIG_PATH
     
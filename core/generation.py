@@ -0,0 +1,89 @@
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, QTimer, Signal
+from core.bash_emitter import IncrementalBashEmitter
+from core.config import Config
+
+class _JobSignals(QObject):
+    finished = Signal(int, object)
+
+
+class _GenerationJob(QRunnable):
+    def __init__(self, generation: int, snapshot):
+        super().__init__()
+        self.generation = generation
+        self.snapshot = snapshot
+        self.signals = _JobSignals()
+
+    def run(self):
+        emitter = IncrementalBashEmitter(self.snapshot)
+        emitter.emit()
+        self.signals.finished.emit(self.generation, emitter)
+
+
+class GenerationScheduler(QObject):
+    # Collapses bursts of generation requests into one job. Changes that only touch
+    # single-line nodes are patched on the GUI thread (cheap), everything else is
+    # emitted from a snapshot of the graph on a worker thread. A result is only
+    # published if no newer request arrived while it was being computed.
+    script_ready = Signal(str)
+    script_patched = Signal(list)
+
+    DELAY_MS = 40
+
+    def __init__(self, graph, parent=None):
+        super().__init__(parent)
+        self.graph = graph
+        self.emitter = IncrementalBashEmitter(graph)
+        self._generation = 0
+        self._job = None
+        self._pending = False
+        self._needs_full = True
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._run)
+
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+
+    def set_graph(self, graph):
+        self.graph = graph
+        self.emitter = IncrementalBashEmitter(graph)
+        self._needs_full = True
+        self.request(immediate=True)
+
+    def request(self, immediate=False):
+        self._generation += 1
+        self._timer.start(0 if immediate else self.DELAY_MS)
+
+    def _run(self):
+        if self._job is not None:
+            # Only one job at a time, the latest state is generated once it is done
+            self._pending = True
+            return
+
+        if Config.INCREMENTAL_GEN and not self._needs_full:
+            patches = self.emitter.update(allow_full=False)
+            if patches is not None:
+                if patches:
+                    self.script_patched.emit(patches)
+                return
+
+        self._needs_full = True
+        # The snapshot covers every change made so far
+        self.graph.dirty_nodes.clear()
+        job = _GenerationJob(self._generation, self.graph.snapshot())
+        job.signals.finished.connect(self._on_job_finished)
+        self._job = job
+        self._pool.start(job)
+
+    def _on_job_finished(self, generation: int, emitter: IncrementalBashEmitter):
+        self._job = None
+        if generation == self._generation and emitter.graph.structure_version == self.graph.structure_version:
+            self.emitter.adopt(emitter)
+            self._needs_full = False
+            self.script_ready.emit(emitter.script)
+
+        if self._pending or generation != self._generation:
+            self._pending = False
+            self._timer.start(0)
+
@@ -6,7 +6,7 @@ from core.port_types import PortType, PortDirection
 
 class Port:
     def __init__(self, name: str, port_type: PortType, direction: PortDirection, node: 'Node', tooltip=""):
-        self.id = str(uuid4())
+        self._id: Optional[str] = None
         self.name = name
         self.port_type = port_type
         self.direction = direction
@@ -14,6 +14,18 @@ class Port:
         self.value: Any = None
         self.connected_edges: List['Edge'] = []
         self.tooltip = tooltip
+
+    @property
+    def id(self) -> str:
+        # Only generated when something refers to the port by id (saved graphs, port items),
+        # building a graph from a binary file doesn't need it
+        if self._id is None:
+            self._id = str(uuid4())
+        return self._id
+
+    @id.setter
+    def id(self, value: str):
+        self._id = value
     
     def can_connect_to(self, other: 'Port') -> bool:
         if self.direction == other.direction:
@@ -27,7 +39,7 @@ class Port:
 
     def get_condition(self, context):
         if self.connected_edges:
-            return self.connected_edges[0].source.node.emit_condition(context)
+            return context.condition_of(self.connected_edges[0].source)
         return self.value
     
 class Node:
@@ -82,9 +94,28 @@ class Graph:
     def __init__(self):
         self.nodes: Dict[str, Node] = {}
         self.edges: Dict[str, Edge] = {}
+        # node id -> {neighbour node id: number of edges}, kept in sync by add/remove
+        self._successors: Dict[str, Dict[str, int]] = {}
+        self._predecessors: Dict[str, Dict[str, int]] = {}
+        # Change tracking for incremental generation: any change to the exec flow bumps
+        # structure_version, data edges and property edits only mark the target node dirty
+        self.structure_version = 0
+        self.dirty_nodes = set()
     
     def add_node(self, node: Node):
         self.nodes[node.id] = node
+        self._successors.setdefault(node.id, {})
+        self._predecessors.setdefault(node.id, {})
+        self.structure_version += 1
+
+    def mark_dirty(self, node_id: str):
+        self.dirty_nodes.add(node_id)
+
+    def _edge_changed(self, edge: 'Edge'):
+        if edge.source.port_type == PortType.EXEC:
+            self.structure_version += 1
+        else:
+            self.mark_dirty(edge.target.node.id)
     
     def remove_node(self, node_id: str):
         node = self.nodes.get(node_id)
@@ -101,6 +132,9 @@ class Graph:
             self.remove_edge(edge_id)
 
         del self.nodes[node_id]
+        self._successors.pop(node_id, None)
+        self._predecessors.pop(node_id, None)
+        self.structure_version += 1
 
     
     def add_edge(self, source: Port, target: Port) -> Optional[Edge]:
@@ -108,6 +142,8 @@ class Graph:
             return None
         edge = Edge(source, target)
         self.edges[edge.id] = edge
+        self._link(source.node.id, target.node.id)
+        self._edge_changed(edge)
         return edge
     
     def remove_edge(self, edge_id: str):
@@ -115,7 +151,72 @@ class Graph:
             edge = self.edges[edge_id]
             edge.disconnect()
             del self.edges[edge_id]
+            self._unlink(edge.source.node.id, edge.target.node.id)
+            self._edge_changed(edge)
+
+    def _link(self, src_id: str, tgt_id: str):
+        succ = self._successors.setdefault(src_id, {})
+        succ[tgt_id] = succ.get(tgt_id, 0) + 1
+        pred = self._predecessors.setdefault(tgt_id, {})
+        pred[src_id] = pred.get(src_id, 0) + 1
+
+    def _unlink(self, src_id: str, tgt_id: str):
+        for index, a, b in ((self._successors, src_id, tgt_id), (self._predecessors, tgt_id, src_id)):
+            neighbours = index.get(a)
+            if not neighbours or b not in neighbours:
+                continue
+            neighbours[b] -= 1
+            if neighbours[b] <= 0:
+                del neighbours[b]
+
+    def successors(self, node_id: str):
+        return self._successors.get(node_id, {}).keys()
+
+    def predecessors(self, node_id: str):
+        return self._predecessors.get(node_id, {}).keys()
+
+    def can_reach(self, start_id: str, target_id: str) -> bool:
+        visited = {start_id}
+        stack = [start_id]
+        while stack:
+            node_id = stack.pop()
+            if node_id == target_id:
+                return True
+            for next_id in self._successors.get(node_id, ()):
+                if next_id not in visited:
+                    visited.add(next_id)
+                    stack.append(next_id)
+        return False
     
+    def snapshot(self) -> 'Graph':
+        # Detached copy keeping node, port and edge ids, so it can be emitted on
+        # another thread while the editor keeps changing this graph
+        copy = Graph()
+        ports: Dict[str, Port] = {}
+        for node in self.nodes.values():
+            clone = node.__class__()
+            clone.id = node.id
+            clone.title = node.title
+            clone.x = node.x
+            clone.y = node.y
+            clone.properties = dict(node.properties)
+            for port, cloned_port in zip(node.inputs + node.outputs, clone.inputs + clone.outputs):
+                cloned_port.id = port.id
+                cloned_port.value = port.value
+                ports[port.id] = cloned_port
+            copy.add_node(clone)
+
+        for edge in self.edges.values():
+            cloned_edge = copy.add_edge(ports[edge.source.id], ports[edge.target.id])
+            if cloned_edge:
+                del copy.edges[cloned_edge.id]
+                cloned_edge.id = edge.id
+                copy.edges[edge.id] = cloned_edge
+
+        copy.structure_version = self.structure_version
+        copy.dirty_nodes.clear()
+        return copy
+
     def get_start_node(self) -> Optional[Node]:
         for node in self.nodes.values():
             if node.node_type == "start":
@@ -1,142 +1,156 @@
-from PySide6.QtGui import QSyntaxHighlighter, QTextCharFormat, QColor, QFont
-from PySide6.QtCore import QRegularExpression
+import re
+from PySide6.QtGui import QSyntaxHighlighter, QTextCharFormat, QColor
+from PySide6.QtCore import QTimer
+
+KEYWORDS = frozenset([
+    "if", "then", "else", "elif", "fi",
+    "for", "while", "do", "done",
+    "case", "esac", "in",
+    "select", "until", "break",
+    "continue", "return", "exit"
+])
+
+COMMANDS = frozenset([
+    "echo", "cd", "pwd", "read", "printf",
+    "mkdir", "rm", "cp", "mv", "touch",
+    "chmod", "chown", "grep", "sed", "awk",
+    "curl", "wget", "sudo", "apt", "dnf",
+    "pacman", "zypper", "systemctl", "ls",
+    "cat", "head", "tail", "diff", "find",
+    "xargs", "tar", "zip", "unzip",
+    "ssh", "scp", "git", "make", "gcc",
+    "gdb", "docker", "kubectl",
+    "npm", "yarn", "node", "python", "java",
+    "javac", "perl", "ruby", "php",
+    "mysql", "psql", "top", "htop",
+    "kill", "ping", "traceroute",
+    "ifconfig", "netstat", "ssh-keygen",
+    "alias", "unalias", "export", "source",
+    "history", "clear", "man", "help", "which",
+    "env", "printenv", "date", "time", "uptime",
+    "df", "du", "mount", "umount", "service", "set",
+    "unset", "jobs", "fg", "bg", "wait", "trap", "test",
+    "expr", "bc", "cut", "sort", "uniq", "wc", "tee",
+    "cmp", "stat", "file", "basename", "dirname", "readlink",
+    "ln", "sleep", "shift", "getopts", "let", "eval",
+    "exec", "disown", "shopt", "complete", "compgen", "mapfile",
+])
+
+# One pass per line: the first alternative that matches at a position wins, words are then
+# looked up in the function / keyword / command sets
+TOKEN_REGEX = re.compile(r"""
+    (?P<comment>(?<![^\s;&|(])\#.*)
+  | (?P<string>"[^"\\]*(?:\\.[^"\\]*)*"|'[^']*')
+  | (?P<variable>\$\{?[A-Za-z_][A-Za-z0-9_]*\}?)
+  | (?P<number>\b\d+\b)
+  | (?P<word>\b[A-Za-z_][A-Za-z0-9_-]*)
+""", re.VERBOSE)
+VARIABLE_REGEX = re.compile(r"\$\{?[A-Za-z_][A-Za-z0-9_]*\}?")
+FUNCTION_DEF_REGEX = re.compile(r"^\s*([A-Za-z_][A-Za-z0-9_]*)\s*\(\)\s*\{", re.MULTILINE)
+
+HIGHLIGHT_COLORS = {
+    "keyword": "#C792EA",
+    "function_def": "#D000FF",
+    "function_call": "#D000FF",
+    "command": "#82AAFF",
+    "string": "#C3E88D",
+    "comment": "#616161",
+    "variable": "#F78C6C",
+    "number": "#FFCB6B",
+}
+
+# Block states
+NO_FUNCTION = 0
+DEFINES_FUNCTION = 1
+
+
+def find_functions(text: str) -> set:
+    return set(FUNCTION_DEF_REGEX.findall(text))
+
+
+def tokenize_line(text: str, known_functions) -> list:
+    # (start, length, kind) spans of one line, kind is a key of HIGHLIGHT_COLORS. Later spans
+    # are drawn over earlier ones (variables inside strings, the name of a definition)
+    spans = []
+    for token in TOKEN_REGEX.finditer(text):
+        kind = token.lastgroup
+        start = token.start()
+        length = token.end() - start
+        if kind == "word":
+            word = token.group()
+            if word in known_functions:
+                spans.append((start, length, "function_call"))
+            elif word in KEYWORDS:
+                spans.append((start, length, "keyword"))
+            elif word in COMMANDS:
+                spans.append((start, length, "command"))
+            continue
+
+        spans.append((start, length, kind))
+        if kind == "string" and text[start] == '"':
+            for variable in VARIABLE_REGEX.finditer(text, start, token.end()):
+                spans.append((variable.start(), variable.end() - variable.start(), "variable"))
+
+    match = FUNCTION_DEF_REGEX.match(text)
+    if match:
+        spans.append((match.start(1), match.end(1) - match.start(1), "function_def"))
+    return spans
 
 
 class BashHighlighter(QSyntaxHighlighter):
     def __init__(self, document):
         super().__init__(document)
 
-        self.rules = []
+        # Names of the functions defined in the document, kept up to date by _refresh_functions
         self.known_functions = set()
-        keyword = QTextCharFormat()
-        keyword.setForeground(QColor("#C792EA"))
-
-        function_def = QTextCharFormat()
-        function_def.setForeground(QColor("#D000FF"))
-
-        function_call = QTextCharFormat()
-        function_call.setForeground(QColor("#D000FF"))
-
-        command = QTextCharFormat()
-        command.setForeground(QColor("#82AAFF"))
-
-        string = QTextCharFormat()
-        string.setForeground(QColor("#C3E88D"))
-
-        comment = QTextCharFormat()
-        comment.setForeground(QColor("#616161"))
-        comment.setFontItalic(True)
-
-        variable = QTextCharFormat()
-        variable.setForeground(QColor("#F78C6C"))
-
-        number = QTextCharFormat()
-        number.setForeground(QColor("#FFCB6B"))
-        keywords = [
-            "if", "then", "else", "elif", "fi",
-            "for", "while", "do", "done",
-            "case", "esac", "in",
-            "select", "until", "break",
-            "continue", "return", "exit"
-        ]
-        for kw in keywords:
-            self.rules.append((
-                QRegularExpression(rf"\b{kw}\b"),
-                keyword
-            ))
-
-        commands = [
-            "echo", "cd", "pwd", "read", "printf",
-            "mkdir", "rm", "cp", "mv", "touch",
-            "chmod", "chown", "grep", "sed", "awk",
-            "curl", "wget", "sudo", "apt", "dnf",
-            "pacman", "zypper", "systemctl", "ls",
-            "cat", "head", "tail", "diff", "find",
-            "xargs", "tar", "zip", "unzip",
-            "ssh", "scp", "git", "make", "gcc",
-            "gdb", "docker", "kubectl",
-            "npm", "yarn", "node", "python", "java",
-            "javac", "perl", "ruby", "php",
-            "mysql", "psql", "top", "htop",
-            "kill", "ping", "traceroute",
-            "ifconfig", "netstat", "ssh-keygen",
-            "alias", "unalias", "export", "source",
-            "history", "clear", "man", "help", "which",
-            "env", "printenv", "date", "time", "uptime", 
-            "df", "du", "mount", "umount", "service", "set",
-            "unset", "jobs", "fg", "bg", "wait", "trap", "test", 
-            "expr", "bc", "cut", "sort", "uniq", "wc", "tee", "diff",
-            "cmp", "stat", "file", "basename", "dirname", "readlink",
-            "ln", "sleep", "shift", "getopts", "printf", "let", "eval",
-            "exec", "disown", "shopt", "complete", "compgen", "mapfile", 
-
-        ]
-        for cmd in commands:
-            self.rules.append((
-                QRegularExpression(rf"\b{cmd}\b"),
-                command
-            ))
-
-        self.rules.append((
-            QRegularExpression(r'"[^"\\]*(\\.[^"\\]*)*"'),
-            string
-        ))
-        self.rules.append((
-            QRegularExpression(r"'[^'\\]*(\\.[^'\\]*)*'"),
-            string
-        ))
-
-        self.rules.append((
-            QRegularExpression(r"\$\{?[A-Za-z_][A-Za-z0-9_]*\}?"),
-            variable
-        ))
-
-        self.rules.append((
-            QRegularExpression(r"\b\d+\b"),
-            number
-        ))
-
-        self.rules.append((
-            QRegularExpression(r"#.*"),
-            comment
-        ))
-
-        self.function_def_regex = QRegularExpression(
-            r"^\s*([A-Za-z_][A-Za-z0-9_]*)\s*\(\)\s*\{"
-        )
-        self.function_def_format = function_def
-        self.function_call_format = function_call
-
-    
+        self._refresh_pending = False
+
+        self.formats = {}
+        for kind, color in HIGHLIGHT_COLORS.items():
+            char_format = QTextCharFormat()
+            char_format.setForeground(QColor(color))
+            if kind == "comment":
+                char_format.setFontItalic(True)
+            self.formats[kind] = char_format
+
+        # Removing lines may remove a function definition without highlighting it again
+        document.contentsChange.connect(self._on_contents_change)
+
     def highlightBlock(self, text: str):
-        match = self.function_def_regex.match(text)
-        if match.hasMatch():
-            name = match.captured(1)
-            self.known_functions.add(name)
-
-            self.setFormat(
-                match.capturedStart(1),
-                match.capturedLength(1),
-                self.function_def_format
-            )
-
-        for regex, fmt in self.rules:
-            it = regex.globalMatch(text)
-            while it.hasNext():
-                m = it.next()
-                self.setFormat(
-                    m.capturedStart(),
-                    m.capturedLength(),
-                    fmt
-                )
-
-        for fn in self.known_functions:
-            call_regex = QRegularExpression(rf"\b{fn}\b")
-            it = call_regex.globalMatch(text)
-            while it.hasNext():
-                m = it.next()
-                self.setFormat(
-                    m.capturedStart(),
-                    m.capturedLength(),
-                    self.function_call_format
-                )
+        match = FUNCTION_DEF_REGEX.match(text)
+        defines = match is not None
+        if (defines and match.group(1) not in self.known_functions) or self.currentBlockState() == DEFINES_FUNCTION:
+            self._schedule_refresh()
+        self.setCurrentBlockState(DEFINES_FUNCTION if defines else NO_FUNCTION)
+
+        for start, length, kind in tokenize_line(text, self.known_functions):
+            self.setFormat(start, length, self.formats[kind])
+
+    def _on_contents_change(self, position, removed, added):
+        if removed and self.known_functions:
+            self._schedule_refresh()
+
+    def _schedule_refresh(self):
+        if not self._refresh_pending:
+            self._refresh_pending = True
+            QTimer.singleShot(0, self._refresh_functions)
+
+    def _refresh_functions(self):
+        # Collects the defined functions once for the whole document, then only highlights
+        # again the lines mentioning a function that was added or removed
+        self._refresh_pending = False
+        document = self.document()
+        if document is None:
+            return
+        functions = find_functions(document.toPlainText())
+        changed = functions ^ self.known_functions
+        if not changed:
+            return
+        self.known_functions = functions
+
+        mention = re.compile(r"\b(?:%s)\b" % "|".join(map(re.escape, sorted(changed))))
+        block = document.begin()
+        while block.isValid():
+            if mention.search(block.text()):
+                self.rehighlightBlock(block)
+            block = block.next()
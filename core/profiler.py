@@ -0,0 +1,68 @@
+from dataclasses import dataclass
+from typing import Dict, List
+
+# Instrumented scripts (BashContext(profile=True)) write one line per node entered / left to the
+# file named by $VISH_PROFILE, through a file descriptor of their own so the script's output is
+# untouched: "B|E <node id> <$EPOCHREALTIME> <$BASHPID>". Needs bash 5 for EPOCHREALTIME.
+PROFILE_ENV = "VISH_PROFILE"
+PROFILE_FD = "_vish_prof"
+
+def profile_setup() -> str:
+    return f'exec {{{PROFILE_FD}}}>>"${{{PROFILE_ENV}:-/dev/null}}"'
+
+def profile_marker(kind: str, node_id: str) -> str:
+    return f'printf \'{kind} %s %s %s\\n\' {node_id} "$EPOCHREALTIME" "$BASHPID" >&${PROFILE_FD}'
+
+@dataclass
+class NodeTiming:
+    node_id: str
+    calls: int = 0
+    total: float = 0.0
+    self_time: float = 0.0
+
+def parse_profile(text: str) -> Dict[str, NodeTiming]:
+    # Markers nest: the time of a node includes the nodes emitted inside it (if and loop bodies,
+    # called functions), its self time does not. Each process (background jobs, subshells) has
+    # its own stack. A node left through exit/return has no end marker and is not counted.
+    timings: Dict[str, NodeTiming] = {}
+    stacks: Dict[str, List[list]] = {}
+
+    for line in text.splitlines():
+        parts = line.split()
+        if len(parts) != 4 or parts[0] not in ("B", "E"):
+            continue
+        kind, node_id, stamp, pid = parts
+        try:
+            # EPOCHREALTIME uses the locale's decimal separator
+            now = float(stamp.replace(",", "."))
+        except ValueError:
+            continue
+
+        stack = stacks.setdefault(pid, [])
+        if kind == "B":
+            stack.append([node_id, now, 0.0])
+            continue
+
+        while stack and stack[-1][0] != node_id:
+            stack.pop()
+        if not stack:
+            continue
+        _, start, children = stack.pop()
+        elapsed = now - start
+
+        timing = timings.get(node_id)
+        if timing is None:
+            timing = timings[node_id] = NodeTiming(node_id)
+        timing.calls += 1
+        # A node can be nested in itself (recursive function), only count the outer run
+        if not any(frame[0] == node_id for frame in stack):
+            timing.total += elapsed
+        timing.self_time += elapsed - children
+        if stack:
+            stack[-1][2] += elapsed
+
+    return timings
+
+def read_profile(path: str) -> Dict[str, NodeTiming]:
+    with open(path, encoding="utf-8", errors="replace") as f:
+        return parse_profile(f.read())
@@ -0,0 +1,200 @@
+import codecs
+import os
+import select
+import signal
+import subprocess
+import sys
+from PySide6.QtCore import QObject, QProcess, QProcessEnvironment, QSocketNotifier, QTimer, Signal
+
+IS_WINDOWS = sys.platform == "win32"
+
+if not IS_WINDOWS:
+    import pty
+
+# bash -i prints these when it doesn't get a controlling terminal
+PTY_NOISE = (
+    "cannot set terminal process group",
+    "no job control in this shell",
+)
+
+class ScriptRunner(QObject):
+    # Runs a script without blocking the event loop. Output is streamed through
+    # output_received as it arrives, finished carries the exit code (-1 if it
+    # could not start or was killed).
+    output_received = Signal(str)
+    finished = Signal(int)
+
+    READ_SIZE = 65536
+    KILL_TIMEOUT_MS = 2000
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._proc = None
+        self._process = None
+        self._master_fd = None
+        self._notifier = None
+        self._decoders = {}
+        self._pending_cr = ""
+        self._filter_noise = False
+
+        self._exit_timer = QTimer(self)
+        self._exit_timer.setInterval(20)
+        self._exit_timer.timeout.connect(self._poll_exit)
+
+    def is_running(self) -> bool:
+        return self._proc is not None or self._process is not None
+
+    def start(self, script_path: str, use_pty=True, bash_cmd="bash", env=None):
+        # env: extra environment variables for the script
+        if self.is_running():
+            return
+        self._decoders = {}
+        self._pending_cr = ""
+        if use_pty and not IS_WINDOWS:
+            self._start_pty(script_path, env)
+        else:
+            self._start_process(script_path, bash_cmd, env)
+
+    def cancel(self):
+        if self._proc is not None:
+            self._signal_group(signal.SIGHUP) # interactive bash ignores SIGTERM
+            QTimer.singleShot(self.KILL_TIMEOUT_MS, lambda proc=self._proc: self._force_kill(proc))
+        elif self._process is not None:
+            self._process.terminate()
+            QTimer.singleShot(self.KILL_TIMEOUT_MS, lambda process=self._process: self._force_kill(process))
+
+    def _start_pty(self, script_path: str, env=None):
+        master_fd, slave_fd = pty.openpty()
+        self._proc = subprocess.Popen(
+            ["bash", "-i", script_path],
+            stdin=slave_fd,
+            stdout=slave_fd,
+            stderr=slave_fd,
+            close_fds=True,
+            start_new_session=True,
+            env={**os.environ, **env} if env else None,
+        )
+        os.close(slave_fd)
+
+        self._master_fd = master_fd
+        self._filter_noise = True
+        self._notifier = QSocketNotifier(master_fd, QSocketNotifier.Read, self)
+        self._notifier.activated.connect(self._read_pty)
+        self._exit_timer.start()
+
+    def _read_pty(self):
+        try:
+            data = os.read(self._master_fd, self.READ_SIZE)
+        except OSError: # EIO once every process holding the slave side is gone
+            data = b""
+
+        if not data:
+            self._close_pty()
+            return
+
+        text = self._decode_pty(data)
+        if self._filter_noise:
+            text = self._strip_noise(text)
+        if text:
+            self.output_received.emit(text)
+
+    def _decode(self, data: bytes, channel: str, final=False) -> str:
+        decoder = self._decoders.get(channel)
+        if decoder is None:
+            decoder = self._decoders[channel] = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        return decoder.decode(data, final)
+
+    def _decode_pty(self, data: bytes, final=False) -> str:
+        # The pty turns \n into \r\n, a \r at the end of a chunk may be followed by \n in the next one
+        text = self._pending_cr + self._decode(data, "pty", final)
+        self._pending_cr = ""
+        if text.endswith("\r") and not final:
+            text, self._pending_cr = text[:-1], "\r"
+        return text.replace("\r\n", "\n")
+
+    def _strip_noise(self, text: str) -> str:
+        kept = []
+        for line in text.splitlines(keepends=True):
+            if any(noise in line for noise in PTY_NOISE):
+                continue
+            kept.append(line)
+            if line.strip():
+                self._filter_noise = False
+        return "".join(kept)
+
+    def _close_pty(self):
+        if self._notifier is not None:
+            self._notifier.setEnabled(False)
+            self._notifier.deleteLater()
+            self._notifier = None
+        if self._master_fd is not None:
+            os.close(self._master_fd)
+            self._master_fd = None
+
+    def _poll_exit(self):
+        code = self._proc.poll()
+        if code is None:
+            return
+        self._exit_timer.stop()
+        # Drain what is left, the slave side may still be held open by background jobs
+        while self._master_fd is not None and select.select([self._master_fd], [], [], 0)[0]:
+            self._read_pty()
+        self._close_pty()
+        tail = self._decode_pty(b"", final=True)
+        if tail:
+            self.output_received.emit(tail)
+        self._proc = None
+        self.finished.emit(code)
+
+    def _signal_group(self, sig):
+        try:
+            os.killpg(self._proc.pid, sig)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    def _start_process(self, script_path: str, bash_cmd: str, env=None):
+        process = QProcess(self)
+        self._process = process
+        if env:
+            environment = QProcessEnvironment.systemEnvironment()
+            for name, value in env.items():
+                environment.insert(name, value)
+            process.setProcessEnvironment(environment)
+        process.readyReadStandardOutput.connect(
+            lambda: self._emit_process_output(process.readAllStandardOutput(), "stdout")
+        )
+        process.readyReadStandardError.connect(
+            lambda: self._emit_process_output(process.readAllStandardError(), "stderr")
+        )
+        process.finished.connect(self._on_process_finished)
+        process.errorOccurred.connect(self._on_process_error)
+        process.start(bash_cmd, [script_path])
+
+    def _emit_process_output(self, data, channel: str):
+        text = self._decode(bytes(data), channel)
+        if not text:
+            return
+        if channel == "stderr":
+            text = f"\x1b[31m{text}\x1b[0m"
+        self.output_received.emit(text)
+
+    def _on_process_finished(self, code, status):
+        if self._process is None:
+            return
+        process = self._process
+        self._process = None
+        process.deleteLater()
+        self.finished.emit(code if status == QProcess.NormalExit else -1)
+
+    def _on_process_error(self, error):
+        if error != QProcess.FailedToStart or self._process is None:
+            return
+        self.output_received.emit(f"\x1b[1;31mError:\x1b[0m\n{self._process.errorString()}\n")
+        self._on_process_finished(-1, QProcess.CrashExit)
+
+    def _force_kill(self, target):
+        if isinstance(target, QProcess):
+            if target is self._process:
+                target.kill()
+        elif target is self._proc and target.poll() is None:
+            self._signal_group(signal.SIGKILL)
@@ -0,0 +1,119 @@
+from typing import Dict, List, Optional, Tuple
+from core.traduction import Traduction
+from nodes.registry import NODE_REGISTRY
+
+# Search index of the node palette: for every node type, its label, type id, category and
+# description in every language, lowercased once. A query is split into terms, every term has
+# to match one of the fields, as a substring or, for labels and type ids, as a subsequence
+# ("rcmd" -> "run command"). Long descriptions would match almost any subsequence.
+
+# How much a match in each field counts
+FIELD_WEIGHTS = {
+    "label": 1.0,
+    "type": 0.9,
+    "category": 0.5,
+    "description": 0.3,
+}
+FUZZY_FIELDS = ("label", "type")
+
+
+def match_score(term: str, text: str, fuzzy=True) -> float:
+    # 0 when term doesn't match text, up to 100 for an exact match
+    if term == text:
+        return 100.0
+    index = text.find(term)
+    if index == 0:
+        return 80.0
+    if index > 0:
+        return 70.0 if not text[index - 1].isalnum() else 60.0
+    if not fuzzy:
+        return 0.0
+
+    # Subsequence: consecutive characters and word starts count more
+    points = 0
+    position = 0
+    previous = -2
+    for char in term:
+        index = text.find(char, position)
+        if index < 0:
+            return 0.0
+        if index == previous + 1:
+            points += 3
+        elif index == 0 or not text[index - 1].isalnum():
+            points += 2
+        else:
+            points += 1
+        previous = index
+        position = index + 1
+    return 50.0 * points / (3 * len(term))
+
+
+class NodeSearchIndex:
+    def __init__(self, registry: Dict[str, dict], models: List[dict]):
+        # node type -> [(text, weight, fuzzy)], and the characters found in any of them to reject most
+        # node types without scoring them
+        self.entries: Dict[str, List[Tuple[str, float, bool]]] = {}
+        self.characters: Dict[str, frozenset] = {}
+        self.order: List[str] = list(registry)
+
+        for node_type, meta in registry.items():
+            texts = {}
+            candidates = [
+                ("type", node_type),
+                ("label", meta.get("label", "")),
+                ("category", meta.get("category", "")),
+                ("description", meta.get("description", "")),
+            ]
+            for model in models:
+                candidates += [
+                    ("label", model.get(f"{node_type}_label", "")),
+                    ("category", model.get(meta.get("category", ""), "")),
+                    ("description", model.get(f"{node_type}_desc", "")),
+                ]
+            for field, text in candidates:
+                text = text.lower()
+                if text:
+                    weight, fuzzy = texts.get(text, (0.0, False))
+                    texts[text] = (max(weight, FIELD_WEIGHTS[field]), fuzzy or field in FUZZY_FIELDS)
+            self.entries[node_type] = [(text, weight, fuzzy) for text, (weight, fuzzy) in texts.items()]
+            self.characters[node_type] = frozenset("".join(texts))
+
+    def search(self, query: str) -> Optional[List[str]]:
+        # Matching node types, best first. None for an empty query (everything matches)
+        terms = query.lower().split()
+        if not terms:
+            return None
+        needed = frozenset("".join(terms))
+
+        scored = []
+        for rank, node_type in enumerate(self.order):
+            if not needed <= self.characters[node_type]:
+                continue
+            total = 0.0
+            for term in terms:
+                best = max(
+                    (match_score(term, text, fuzzy) * weight for text, weight, fuzzy in self.entries[node_type]),
+                    default=0.0
+                )
+                if not best:
+                    break
+                total += best
+            else:
+                scored.append((-total, rank, node_type))
+
+        scored.sort()
+        return [node_type for _, _, node_type in scored]
+
+
+_index: Optional[NodeSearchIndex] = None
+_index_key = None
+
+
+def node_search_index() -> NodeSearchIndex:
+    # Built on first use, again only when node types were registered since
+    global _index, _index_key
+    key = tuple(NODE_REGISTRY)
+    if _index is None or _index_key != key:
+        _index = NodeSearchIndex(NODE_REGISTRY, Traduction.all_models())
+        _index_key = key
+    return _index
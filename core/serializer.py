@@ -1,6 +1,8 @@
 import json
+from pathlib import Path
 from typing import Dict, Any
 from .graph import Graph, Node, Port
+from .binary_graph import BinaryGraphReader, is_binary_graph, pack_graph_data
 
 class Serializer:
     VERSION = "0.0.0.beta"
@@ -11,6 +13,10 @@ class Serializer:
     
     @staticmethod
     def serialize(graph: Graph, graph_view) -> str:
+        return json.dumps(Serializer.to_data(graph, graph_view), indent=2)
+
+    @staticmethod
+    def to_data(graph: Graph, graph_view) -> dict:
         data = {
             "version": Serializer.VERSION,
             "nodes": [],
@@ -53,11 +59,14 @@ class Serializer:
                     "locked": item.locked
                 })
         
-        return json.dumps(data, indent=2)
+        return data
     
     @staticmethod
     def deserialize(json_str: str, node_factory) -> Graph:
-        data = json.loads(json_str)
+        return Serializer.from_data(json.loads(json_str), node_factory)
+
+    @staticmethod
+    def from_data(data: dict, node_factory) -> Graph:
         graph = Graph()
         port_map = {}
 
@@ -88,6 +97,22 @@ class Serializer:
                 graph.add_edge(source, target)
         return graph, data.get("comments", [])
 
+    @staticmethod
+    def save(path, graph: Graph, graph_view):
+        path = Path(path)
+        if is_binary_graph(path):
+            path.write_bytes(pack_graph_data(Serializer.to_data(graph, graph_view)))
+        else:
+            path.write_text(Serializer.serialize(graph, graph_view))
+
+    @staticmethod
+    def load(path, node_factory):
+        path = Path(path)
+        if is_binary_graph(path):
+            with BinaryGraphReader.open(path) as reader:
+                return reader.to_graph(node_factory)
+        return Serializer.deserialize(path.read_text(), node_factory)
+
     def serialize_node(self, node):
         return {
             "id": node.id,
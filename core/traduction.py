@@ -1,8 +1,10 @@
 import json
+import os
 from core.debug import Info
 
 class Traduction:
     model = {}
+    _all_models = None
     
     @staticmethod
     def set_translate_model(lang: str):
@@ -20,4 +22,15 @@ class Traduction:
             return text.format(**kwargs)
         except Exception:
             return text
-        
\ No newline at end of file
+
+    @staticmethod
+    def all_models():
+        # Every language model, for searches that have to match in any language
+        if Traduction._all_models is None:
+            models_dir = Info.resource_path("assets/models")
+            Traduction._all_models = []
+            for name in sorted(os.listdir(models_dir)):
+                if name.endswith(".json"):
+                    with open(os.path.join(models_dir, name), encoding='utf-8') as data:
+                        Traduction._all_models.append(json.load(data))
+        return Traduction._all_models
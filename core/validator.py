@@ -2,7 +2,7 @@ from core.port_types import PortDirection
 
 class GraphValidator:
     @staticmethod
-    def is_valid_connection(graph, existing_edges, a, b) -> bool:
+    def is_valid_connection(graph, a, b) -> bool:
         if a is b:
             return False
 
@@ -25,28 +25,11 @@ class GraphValidator:
         if GraphValidator._can_reach(graph, dst.node, src.node):
             return False
 
-        for edge in existing_edges:
-            if edge.target_port is (b if b.is_input else a):
-                return False
+        if dst.connected_edges:
+            return False
 
         return True
 
     @staticmethod
     def _can_reach(graph, start_node, target_node) -> bool:
-        visited = set()
-
-        def dfs(node):
-            if node.id in visited:
-                return False
-            visited.add(node.id)
-
-            if node is target_node:
-                return True
-
-            for edge in graph.edges.values():
-                if edge.source.node is node:
-                    if dfs(edge.target.node):
-                        return True
-            return False
-
-        return dfs(start_node)
\ No newline at end of file
+        return graph.can_reach(start_node.id, target_node.id)
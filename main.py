@@ -1,52 +1,45 @@
 import sys
+import time
+STARTUP_TIME = time.perf_counter() # --profile-startup counts the imports from here
 IS_WINDOWS = sys.platform == "win32"
 
-if not IS_WINDOWS:
-    import pty
+if __name__ == "__main__" and sys.argv[1:2] in (["compile"], ["convert"]):
+    # Headless mode: must run before any PySide6 import below
+    from core.cli import main as cli_main
+    sys.exit(cli_main(sys.argv[1:]))
 
 import os
-import sys
-import subprocess
-import time
 from PySide6.QtWidgets import (QApplication, QMainWindow, QVBoxLayout, 
                                QWidget, QPushButton, QHBoxLayout, QTextEdit,
                                QSplitter, QFileDialog, QToolButton, QMenu, QDialog,
-                               QMessageBox)
-from PySide6.QtCore import Qt, QRectF
-from PySide6.QtGui import QColor, QKeySequence, QIcon
+                               QMessageBox, QProgressDialog)
+from PySide6.QtCore import Qt, QEvent, QObject, QTimer
+from PySide6.QtGui import QColor, QKeySequence, QIcon, QTextCursor, QTextCharFormat
 from core.graph import Graph
+from core.generation import GenerationScheduler
 from core.bash_emitter import BashEmitter
+from core.runner import ScriptRunner
 from core.serializer import Serializer
 from nodes.flow_nodes import StartNode, IfNode, ForNode
 from nodes.command_nodes import RunCommandNode, EchoNode, ExitNode, PipeNode
 from nodes.variable_nodes import SetVariableNode, GetVariableNode, FileExistsNode
 from nodes.operation_nodes import Addition
 from nodes.utils_node import ToString
-from ui.comment_box import CommentBoxItem
 from ui.graph_view import GraphView
+from ui.icon_cache import IconCache
 from ui.property_panel import PropertyPanel
-from ui.settings import SettingsDialog
+from ui.script_preview import ScriptPreview
 from ui.menu_style import apply_btn_style, apply_menu_style, apply_icon_for_btn
-from ui.about.about import AboutDialog
-from ui.keyboard_shortcuts import KeyboardShortcutsDialog
-from nodes.registry import NODE_REGISTRY
-from core.highlights import BashHighlighter
-from core.ansi_to_html import ansi_to_html
+from nodes.registry import NODE_REGISTRY, NodeFactory
+from nodes.packs import load_node_packs
+from core.ansi_to_html import ansi_to_html, AnsiHtmlStream
 from core.config import Config, ConfigManager
 from core.debug import Info, Debug
 from core.traduction import Traduction
 from core.projects import ProjectManager
-from ui.welcome import WelcomeScreen
+from core.startup_profile import StartupProfile, startup_profile_requested
 from theme.theme import Theme, set_dark_theme, set_purple_theme, set_white_theme, set_breeze_dark_theme
 
-class NodeFactory:
-    @staticmethod
-    def create_node(node_type: str):
-        entry = NODE_REGISTRY.get(node_type)
-        return entry["class"]() if entry else None
-
-
-
 class VisualBashEditor(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -58,6 +51,18 @@ class VisualBashEditor(QMainWindow):
         self.project_manager = ProjectManager()
         
         self.setup_ui()
+        self.generation = GenerationScheduler(self.graph, self)
+        self.generation.script_ready.connect(self._on_script_ready)
+        self.generation.script_patched.connect(self._on_script_patched)
+
+        self.runner = ScriptRunner(self)
+        self.runner.output_received.connect(self._on_run_output)
+        self.runner.finished.connect(self._on_run_finished)
+        self._run_ansi = AnsiHtmlStream()
+        self._run_script_path = None
+        self._profile_path = None
+        self._profiler_panel = None
+        self._reported_rewrites = []
         self.create_initial_graph()
     
     def setup_ui(self):
@@ -129,6 +134,11 @@ class VisualBashEditor(QMainWindow):
         )
         self.full_screenfs.triggered.connect(self.full_screen_action)
         apply_icon_for_btn(self.full_screenfs, "fullscreen")
+        self.profile_action = self.more_menu.addAction(
+            Traduction.get_trad("profile_run", "Run with Profiler")
+        )
+        self.profile_action.triggered.connect(self.profile_bash)
+        apply_icon_for_btn(self.profile_action, "play")
         self.about_action = self.more_menu.addAction(
             Traduction.get_trad("about", "About")
         )
@@ -147,12 +157,12 @@ class VisualBashEditor(QMainWindow):
         splitter.addWidget(self.graph_view)
         
         self.property_panel = PropertyPanel()
+        self.property_panel.property_changed.connect(self.on_property_changed)
         splitter.addWidget(self.property_panel)
 
         self.output_splitter = QSplitter(Qt.Vertical)
 
-        self.output_text = QTextEdit()
-        self.output_text.setReadOnly(True)
+        self.output_text = ScriptPreview()
         self.output_text.setMinimumWidth(300)
 
         self.run_output_text = QTextEdit()
@@ -162,6 +172,7 @@ class VisualBashEditor(QMainWindow):
         self.run_output_text.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
         self.run_output_text.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
         self.run_output_text.setLineWrapMode(QTextEdit.NoWrap)
+        self.run_output_text.document().setMaximumBlockCount(Config.RUN_SCROLLBACK)
 
         self.output_splitter.addWidget(self.output_text)
         self.output_splitter.addWidget(self.run_output_text)
@@ -169,8 +180,6 @@ class VisualBashEditor(QMainWindow):
 
         splitter.addWidget(self.output_splitter)
 
-        self.bash_highlighter = BashHighlighter(self.output_text.document())
-
         splitter.setSizes([900, 300, 400])
         main_layout.addWidget(splitter)
 
@@ -184,8 +193,16 @@ class VisualBashEditor(QMainWindow):
         self.graph.add_node(start_node)
         self.graph_view.add_node_item(start_node)
     
+    def create_node(self, node_type: str):
+        # None when the node can't be created, the reason is logged
+        try:
+            return self.node_factory.create_node(node_type)
+        except ValueError as e:
+            Debug.Error(str(e))
+            return None
+
     def add_node(self, node_type: str):
-        node = self.node_factory.create_node(node_type)
+        node = self.create_node(node_type)
         if node:
             node.x = 400
             node.y = 300
@@ -196,16 +213,52 @@ class VisualBashEditor(QMainWindow):
         if not self.graph.nodes:
             Debug.Warn(Traduction.get_trad("warn_generating_empty_graph", "Generating an empty graph."))
         print(f"EDGES: {len(self.graph.edges)}")
-        emitter = BashEmitter(self.graph)
-        bash_script = emitter.emit()
-        self.output_text.setPlainText(bash_script)
+        if self.generation.graph is not self.graph:
+            self.generation.set_graph(self.graph)
+        else:
+            self.generation.request()
+
+    def _on_script_ready(self, script):
+        self.output_text.setPlainText(script)
+        self._report_rewrites()
+
+    def _report_rewrites(self):
+        # Builtin rewrites (Config.PREFER_BUILTINS) are reported once, when they change
+        rewrites = [(before, after) for _, before, after in self.generation.emitter.rewrites]
+        if rewrites and rewrites != self._reported_rewrites:
+            Debug.Log(Traduction.get_trad(
+                "builtin_rewrites", "Replaced by bash builtins: {rewrites}",
+                rewrites=", ".join(f"{before} -> {after}" for before, after in rewrites)
+            ))
+        self._reported_rewrites = rewrites
+
+    def _on_script_patched(self, patches):
+        if not self._apply_script_patches(patches):
+            self.output_text.setPlainText(self.generation.emitter.script)
+        self._report_rewrites()
+
+    def _apply_script_patches(self, patches) -> bool:
+        if self.output_text.line_count() != len(self.generation.emitter.lines):
+            return False
+
+        for line, text in patches:
+            self.output_text.set_line(line, text)
+        return True
+
+    def on_property_changed(self, node, key):
+        self.graph.mark_dirty(node.id)
+        if Config.SYNC_NODES_AND_GEN:
+            self.generate_bash()
 
+    # Dialogs and panels are imported when first opened, they are not needed to show the window
     def open_settings(self):
+        from ui.settings import SettingsDialog
         dialog = SettingsDialog(self)
         dialog.traduction_changed.connect(self.graph_view.rebuild_graph)
         dialog.exec()
 
     def open_about(self):
+        from ui.about.about import AboutDialog
         AboutDialog(self).exec()
 
     def full_screen_action(self):
@@ -215,6 +268,7 @@ class VisualBashEditor(QMainWindow):
             self.setWindowState(Qt.WindowState.WindowFullScreen)
 
     def open_keyboard_shortcuts(self):
+        from ui.keyboard_shortcuts import KeyboardShortcutsDialog
         KeyboardShortcutsDialog(self).exec()
         
     def save_graph(self, msg=True):
@@ -228,10 +282,7 @@ class VisualBashEditor(QMainWindow):
 
         file_path = self.project_manager.get_graph_path()
 
-        json_data = Serializer.serialize(self.graph, self.graph_view)
-
-        with open(file_path, 'w') as f:
-            f.write(json_data)
+        Serializer.save(file_path, self.graph, self.graph_view)
 
         if msg:
             Debug.Log("Project saved.")
@@ -239,54 +290,33 @@ class VisualBashEditor(QMainWindow):
     
     def load_graph(self):
         file_path, _ = QFileDialog.getOpenFileName(
-            self, Traduction.get_trad("file_dialog_open", "Load Graph"), "", "JSON Files (*.json)"
+            self, Traduction.get_trad("file_dialog_open", "Load Graph"), "", "Vish Graphs (*.json *.vishb)"
         )
         if not file_path:
             Debug.Error(Traduction.get_trad("error_no_file_selected", "No file selected."))
             return
 
-        with open(file_path, "r") as f:
-            json_data = f.read()
-        
         try:
-            self.graph, comments = Serializer.deserialize(json_data, self.node_factory)
+            self.graph, comments = Serializer.load(file_path, self.node_factory)
         except ValueError as e:
-            # TODO: CustomExeception Class to not rely on generic class with code base specific behaviour (e.g. "e.args[0][1]")
-            msg_box = QMessageBox()
-            msg_box.setText(f"Project contains unknown node type: '{e.args[0][1]}'\nPlease check if a newer version of this tool is available.")
-            msg_box.setIcon(QMessageBox.Icon.Critical)
-            msg_box.exec()
-            raise
-
-        splitter = self.graph_view.parent()
-        old_view = self.graph_view
-
-        self.graph_view = GraphView(self.graph, self)
-        splitter.insertWidget(0, self.graph_view)
-
-        old_view.setParent(None)
-        old_view.deleteLater()
-
-        for node in self.graph.nodes.values():
-            self.graph_view.add_node_item(node)
-
-        for edge in self.graph.edges.values():
-            self.graph_view.graph_scene.add_core_edge(edge, self.graph_view.node_items)
-        
-        for c in comments:
-            box = CommentBoxItem(
-                rect=QRectF(0, 0, c["w"], c["h"]),
-                title=c["title"]
-            )
-            box.setPos(c["x"], c["y"])
-            box.setBrush(QColor(*c["color"]))
-            box.set_locked(c.get("locked", False))
-            self.graph_view.scene().addItem(box)
+            self._show_load_error(e)
+            return
 
-        self._connect_signals()
-        splitter.setSizes([900, 300, 400])
+        self._show_loaded_graph(
+            comments,
+            lambda: Debug.Log(Traduction.get_trad("graph_loaded_successfully", f"Graph loaded successfully from {file_path} with {len(self.graph.nodes)} nodes and {len(self.graph.edges)} edges.", file_path=file_path, node_count=len(self.graph.nodes), edge_count=len(self.graph.edges)))
+        )
 
-        Debug.Log(Traduction.get_trad("graph_loaded_successfully", f"Graph loaded successfully from {file_path} with {len(self.graph.nodes)} nodes and {len(self.graph.edges)} edges.", file_path=file_path, node_count=len(self.graph.nodes), edge_count=len(self.graph.edges)))
+    def _show_load_error(self, error: ValueError):
+        # TODO: CustomExeception Class to not rely on generic class with code base specific behaviour (e.g. "e.args[0][1]")
+        msg_box = QMessageBox()
+        if error.args and isinstance(error.args[0], tuple):
+            msg_box.setText(f"Project contains unknown node type: '{error.args[0][1]}'\nPlease check if a newer version of this tool is available.")
+        else:
+            # Corrupt file, node pack that fails to import...
+            msg_box.setText(f"Cannot load the project: {error}")
+        msg_box.setIcon(QMessageBox.Icon.Critical)
+        msg_box.exec()
 
     def load_current_project(self):
         graph_path = self.project_manager.get_graph_path()
@@ -294,20 +324,16 @@ class VisualBashEditor(QMainWindow):
         if not graph_path.exists():
             return
 
-        with open(graph_path, "r") as f:
-            json_data = f.read()
-
         try:
-            self.graph, comments = Serializer.deserialize(json_data, self.node_factory)
+            self.graph, comments = Serializer.load(graph_path, self.node_factory)
         except ValueError as e:
-            # TODO: CustomExeception Class to not rely on generic class with code base specific behaviour (e.g. "e.args[0][1]")
-            msg_box = QMessageBox()
-            msg_box.setText(f"Project contains unknown node type: '{e.args[0][1]}'\nPlease check if a newer version of this tool is available.")
-            msg_box.setIcon(QMessageBox.Icon.Critical)
-            msg_box.exec()
-            raise
+            self._show_load_error(e)
+            return
 
 
+        self._show_loaded_graph(comments)
+
+    def _show_loaded_graph(self, comments, on_loaded=None):
         splitter = self.graph_view.parent()
         old_view = self.graph_view
 
@@ -318,15 +344,23 @@ class VisualBashEditor(QMainWindow):
         old_view.deleteLater()
 
         self._connect_signals()
-
-        for node in self.graph.nodes.values():
-            self.graph_view.add_node_item(node)
-
-        for edge in self.graph.edges.values():
-            self.graph_view.graph_scene.add_core_edge(edge, self.graph_view.node_items)
-
         splitter.setSizes([900, 300, 400])
 
+        # Items are added in chunks, big graphs get a progress dialog while loading
+        from ui.scene_loader import SceneLoader
+        loader = SceneLoader(self.graph_view, comments, self.graph_view)
+        if loader.total > SceneLoader.CHUNK_SIZE:
+            progress = QProgressDialog(Traduction.get_trad("loading_graph", "Loading graph..."), "", 0, loader.total, self)
+            progress.setCancelButton(None)
+            progress.setWindowModality(Qt.WindowModal)
+            progress.setMinimumDuration(300)
+            progress.setAttribute(Qt.WA_DeleteOnClose)
+            loader.progress.connect(lambda done, total: progress.setValue(done))
+            loader.finished.connect(progress.close)
+        if on_loaded:
+            loader.finished.connect(on_loaded)
+        loader.start()
+
     def auto_save(self):
         if Config.AUTO_SAVE:
             self.save_graph(msg=False)
@@ -336,46 +370,6 @@ class VisualBashEditor(QMainWindow):
         self.graph_view.graph_scene.graph_changed.connect(self.auto_save)
         self.graph_view.graph_scene.node_selected.connect(self.property_panel.set_node)
 
-    def run_pty(self, script_path: str) -> str:
-        master_fd, slave_fd = pty.openpty()
-
-        proc = subprocess.Popen(
-            ["bash", "-i", script_path],
-            stdin=slave_fd,
-            stdout=slave_fd,
-            stderr=slave_fd,
-            close_fds=True,
-            text=False,
-        )
-
-        os.close(slave_fd)
-
-        output = b""
-        while True:
-            try:
-                chunk = os.read(master_fd, 1024)
-                if not chunk:
-                    break
-                output += chunk
-            except OSError:
-                break
-
-        proc.wait()
-        os.close(master_fd)
-
-        output = output.decode(errors="replace")
-
-        filtered = []
-        for line in output.splitlines(): # NOTE: i have to filter some lines because bash -i outputs them
-            if (
-                "cannot set terminal process group" in line
-                or "no job control in this shell" in line
-            ):
-                continue
-            filtered.append(line)
-
-        return "\n".join(filtered)
-
     def find_bash(self):
         if not IS_WINDOWS:
             return "bash"
@@ -397,63 +391,121 @@ class VisualBashEditor(QMainWindow):
         return None
 
 
-    def run_no_pty(self, script_path: str) -> str:
-        bash_cmd = self.find_bash()
-
-        if not bash_cmd:
-            return (
-                "\x1b[1;31mError:\x1b[0m\n"
-                "No Bash executable found.\nInstall Git Bash or enable WSL."
-            )
-
-        result = subprocess.run(
-            [bash_cmd, script_path],
-            capture_output=True,
-            text=True
-        )
-
-        if result.stderr:
-            return f"\x1b[1;31mError:\x1b[0m\n{result.stderr}"
-
-        return result.stdout
-
-    
     def run_bash(self):
+        if self.runner.is_running():
+            self.runner.cancel()
+            return
         if Info.get_os() == "Windows":
             Debug.Warn(Traduction.get_trad("running_windows", "It is not possible to run scripts on Windows."))
             return
-        self.set_run_output_visible(True)
         bash_script = self.output_text.toPlainText()
-        self.run_output_text.clear()
         if not bash_script.strip() or len(bash_script) == 49: # 49 is length of the header
+            self.set_run_output_visible(True)
+            self.run_output_text.clear()
             Debug.Warn(Traduction.get_trad("no_bash_script", "No bash script found to run the graph."))
             return
+        self._start_script(bash_script)
+
+    def profile_bash(self):
+        # Runs an instrumented build of the graph, the timings are shown once it is done
+        if self.runner.is_running():
+            return
+        if Info.get_os() == "Windows":
+            Debug.Warn(Traduction.get_trad("running_windows", "It is not possible to run scripts on Windows."))
+            return
+        from core.profiler import PROFILE_ENV
+        self._profile_path = os.path.abspath(f"temp_profile_{int(time.time())}.txt")
+        self._start_script(
+            BashEmitter(self.graph, profile=True).emit(),
+            env={PROFILE_ENV: self._profile_path}
+        )
+
+    def _start_script(self, bash_script, env=None):
+        self.set_run_output_visible(True)
+        self.run_output_text.clear()
+        self._run_ansi.reset()
+
+        bash_cmd = self.find_bash()
+        if not bash_cmd:
+            self.run_output_text.setHtml(ansi_to_html(
+                "\x1b[1;31mError:\x1b[0m\n"
+                "No Bash executable found.\nInstall Git Bash or enable WSL."
+            ))
+            self._profile_path = None
+            return
 
         temp_script_path = f"temp_script_{int(time.time())}.sh"
         with open(temp_script_path, "w") as f:
             f.write(bash_script)
 
         os.chmod(temp_script_path, 0o755)
+        self._run_script_path = temp_script_path
 
         Debug.Log(Traduction.get_trad("running_generated_bash_script", "Running generated bash script..."))
 
-        try:
-            if Config.USING_TTY:
-                output = self.run_pty(temp_script_path)
-            else:
-                output = self.run_no_pty(temp_script_path)
+        self.run_output_text.setVisible(True)
+        self.output_splitter.setSizes([200, 150])
+        self._set_running(True)
+        self.runner.start(temp_script_path, use_pty=Config.USING_TTY, bash_cmd=bash_cmd, env=env)
 
-            self.run_output_text.setVisible(True)
-            self.output_splitter.setSizes([200, 150])
+    def _on_run_output(self, text):
+        self._append_run_html(self._run_ansi.feed(text))
 
-            self.run_output_text.setHtml(ansi_to_html(output))
+    def _append_run_html(self, html):
+        if not html:
+            return
+        # Appended line by line so that each output line is its own block, which is
+        # what the scrollback limit (maximumBlockCount) counts
+        cursor = QTextCursor(self.run_output_text.document())
+        cursor.movePosition(QTextCursor.End)
+        cursor.beginEditBlock()
+        for i, line in enumerate(html.split("\n")):
+            if i:
+                cursor.setCharFormat(QTextCharFormat())
+                cursor.insertBlock()
+            if line:
+                cursor.insertHtml(f'<span style="white-space:pre">{line}</span>')
+        cursor.endEditBlock()
+
+        scrollbar = self.run_output_text.verticalScrollBar()
+        scrollbar.setValue(scrollbar.maximum())
+
+    def _on_run_finished(self, code):
+        self._append_run_html(self._run_ansi.flush())
+        self._set_running(False)
+        if self._run_script_path and os.path.exists(self._run_script_path):
+            os.remove(self._run_script_path)
+        self._run_script_path = None
+        if self._profile_path:
+            self._show_profile()
+
+    def _show_profile(self):
+        from core.profiler import read_profile
+        from ui.profiler_panel import ProfilerPanel
+        path, self._profile_path = self._profile_path, None
+        try:
+            timings = read_profile(path)
+        except OSError:
+            timings = {}
+        finally:
+            if os.path.exists(path):
+                os.remove(path)
+        if not timings:
+            Debug.Warn(Traduction.get_trad("profile_empty", "No timings were recorded (profiling needs bash 5)."))
+            return
 
-        except Exception as e:
-            self.run_output_text.setVisible(True)
-            self.run_output_text.setPlainText(str(e))
+        if self._profiler_panel is not None:
+            self._profiler_panel.close()
+        self._profiler_panel = ProfilerPanel(self.graph_view, timings, self)
+        self._profiler_panel.show()
 
-        finally:
-            os.remove(temp_script_path)
+    def _set_running(self, running: bool):
+        if running:
+            self.run_bash_btn.setText(Traduction.get_trad("btn_stop_bash", "Stop Script"))
+            self.run_bash_btn.setIcon(QIcon())
+        else:
+            self.run_bash_btn.setText(Traduction.get_trad("btn_run_bash", "Run Bash Script"))
+            apply_icon_for_btn(self.run_bash_btn, "play")
 
     def set_run_output_visible(self, visible: bool):
         self.run_output_text.setVisible(visible)
@@ -471,20 +523,20 @@ class VisualBashEditor(QMainWindow):
         self.generate_btn.setText(Traduction.get_trad("btn_generate_bash", "Generate Bash"))
         self.save_btn.setText(Traduction.get_trad("btn_save", "Save"))
         self.load_btn.setText(Traduction.get_trad("btn_load", "Load"))
-        self.run_bash_btn.setText(Traduction.get_trad("btn_run_bash", "Run Bash Script"))
+        self._set_running(self.runner.is_running())
         self.copy_btn.setText(Traduction.get_trad("btn_copy_clipboard", "Copy to Clipboard"))
 
         self.more_btn.setToolTip(Traduction.get_trad("more_options", "More options"))
         self.settings_action.setText(Traduction.get_trad("settings", "Settings"))
         self.about_action.setText(Traduction.get_trad("about", "About"))
         self.keyboard.setText(Traduction.get_trad("keyboard_shortcuts", "Keyboard Shortcuts"))
+        self.profile_action.setText(Traduction.get_trad("profile_run", "Run with Profiler"))
 
         apply_icon_for_btn(self.settings_action, "settings")
         apply_icon_for_btn(self.about_action, "about")
         apply_icon_for_btn(self.keyboard, "keyboard")
         apply_icon_for_btn(self.generate_btn, "generate")
         apply_icon_for_btn(self.load_btn, "load")
-        apply_icon_for_btn(self.run_bash_btn, "play")
         apply_icon_for_btn(self.copy_btn, "clipboard")
         apply_icon_for_btn(self.save_btn, "save")
         apply_icon_for_btn(self.full_screenfs, "fullscreen")
@@ -500,20 +552,54 @@ class VisualBashEditor(QMainWindow):
             self.run_bash()
         super().keyPressEvent(event)
 
+    def closeEvent(self, event):
+        self.runner.cancel()
+        super().closeEvent(event)
+
+class FirstPaintWatcher(QObject):
+    # Calls callback once the first paint of widget is done
+    def __init__(self, widget, callback):
+        super().__init__(widget)
+        self.callback = callback
+        widget.installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Paint:
+            obj.removeEventFilter(self)
+            QTimer.singleShot(0, self.callback)
+        return False
+
 def main():
+    startup = StartupProfile(STARTUP_TIME, startup_profile_requested(sys.argv))
+    startup.mark("imports")
     ConfigManager.load_config() # Load config before setting theme and language
+    startup.mark("config")
     Traduction.set_translate_model(Config.lang)
+    startup.mark("translations")
 
     app = QApplication(sys.argv)
     app.setOrganizationName("Lluciocc")
     app.setApplicationName("Vish")
     app.setWindowIcon(QIcon(Info.resource_path("assets/icons/icon.png")))
+    startup.mark("application")
+    load_node_packs()
+    startup.mark("node packs")
     editor = VisualBashEditor()
 
     Debug.init(editor)
+    startup.mark("main window")
+
+    def on_first_paint():
+        startup.mark("first paint")
+        startup.report()
+        # The icons of the other node types are decoded once the window is on screen
+        IconCache.preload()
+    FirstPaintWatcher(editor, on_first_paint)
     editor.show()
 
+    from ui.welcome import WelcomeScreen
     welcome = WelcomeScreen(editor, editor.project_manager)
+    startup.mark("welcome screen")
     if welcome.exec() == QDialog.Accepted:
         editor.load_current_project()
     elif welcome.result() == QDialog.Rejected:
@@ -2,7 +2,16 @@ from abc import abstractmethod
 from core.graph import Node, PortType
 from core.bash_context import BashContext
 
+def _profile_marker(kind: str, node_id: str) -> str:
+    # core.profiler is only imported by instrumented compiles
+    from core.profiler import profile_marker
+    return profile_marker(kind, node_id)
+
 class BaseNode(Node):
+    # True when the statement can't change variables or anything a value depends on,
+    # the temporaries of BashContext stay valid after it
+    pure = False
+
     def __init__(self, node_type: str, title: str, color: str):
         super().__init__(node_type, title)
         self.color = color
@@ -17,6 +26,11 @@ class BaseNode(Node):
     def emit_condition(self, context):
         return None
 
+    def constant_value(self, context):
+        # Value of the output when it is known at compile time (int, str or bool), None otherwise.
+        # Only used with optimizations on, see BashContext.constant_of
+        return None
+
     def get_next_exec_node(self):
         exec_outputs = [
             o for o in self.outputs
@@ -27,6 +41,15 @@ class BaseNode(Node):
 
         return exec_outputs[0].connected_edges[0].target.node
     
+    def emit_continuation(self, port, context):
+        # Chain after a block (Next of an if or a loop...), emitted by the block node itself.
+        # It is not part of the node: when profiling, the node's end marker goes before it.
+        if context.profile:
+            context.add_line(_profile_marker("E", self.id))
+            context.profile_closed.add(self.id)
+        if port.connected_edges:
+            BaseNode.emit_exec_chain(port.connected_edges[0].target.node, context)
+
     @staticmethod
     def emit_exec_chain(start_node, context, stop_at=None):
         current = start_node
@@ -36,9 +59,17 @@ class BaseNode(Node):
 
             context.emitted_nodes.add(current.id)
 
+            if context.profile:
+                context.add_line(_profile_marker("B", current.id))
+            mark = context.mark()
             bash = current.emit_bash(context)
+            lines_before_return = context.mark()[1]
             if bash:
                 context.add_line(bash)
+            context.record_fragment(current, mark, bash, lines_before_return)
+            if context.profile and current.id not in context.profile_closed:
+                context.add_line(_profile_marker("E", current.id))
+            context.statement_done(current)
 
             if current == stop_at:
                 break
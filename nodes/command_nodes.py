@@ -1,3 +1,5 @@
+import re
+import shlex
 from core.port_types import PortType
 from core.bash_context import BashContext
 from .base_node import BaseNode
@@ -5,8 +7,8 @@ from nodes.registry import register_node
 
 @register_node("run_command", category="Commands", label="Run a command", description="Executes a shell command")
 class RunCommandNode(BaseNode):
-    def __init__(self):
-        super().__init__("run_command", "Run Command", "#2ECC71")
+    def __init__(self, node_type="run_command", title="Run Command", color="#2ECC71"):
+        super().__init__(node_type, title, color)
         self.add_input("Exec", PortType.EXEC, "Control flow input")
         self.add_input("Command", PortType.STRING, "Command to run")
         self.add_output("Exec", PortType.EXEC, "Control flow output")
@@ -14,6 +16,19 @@ class RunCommandNode(BaseNode):
         self.properties["command"] = "ls"
     
     def emit_bash(self, context: BashContext) -> str:
+        return self._capture(context, self._command())
+
+    def emit_bash_value(self, context: BashContext) -> str:
+        # What the command printed when it ran on the exec chain, it never runs a second time
+        return f'"${context.output_name(self)}"'
+
+    def _capture(self, context: BashContext, command: str) -> str:
+        # With Output connected, the command's stdout goes into a variable instead of the terminal
+        if self.outputs[1].connected_edges:
+            command = f"{context.output_name(self)}=$({command})"
+        return context.prefer_builtin(self, command)
+
+    def _command(self) -> str:
         command = self.properties.get("command", "")
         
         cmd_port = self.inputs[1]
@@ -23,6 +38,69 @@ class RunCommandNode(BaseNode):
         
         return command
 
+# _vish_cached DIR TTL COMMAND [VAR...] prints the output of COMMAND, cached in DIR for TTL seconds
+# (0: forever) under a hash of COMMAND and the values of the VARs. Only successful runs are cached,
+# entries are written to a temporary file and renamed so concurrent runs never read a partial one.
+CACHED_COMMAND_HELPER = r"""_vish_cached() {
+    local _vish_dir=$1 _vish_ttl=$2 _vish_command=$3 _vish_name _vish_key _vish_entry _vish_now _vish_mtime _vish_tmp _vish_status
+    shift 3
+    _vish_key=$(
+        {
+            printf '%s\0' "$_vish_command"
+            for _vish_name in "$@"; do printf '%s=%s\0' "$_vish_name" "${!_vish_name}"; done
+        } | { sha256sum 2>/dev/null || shasum -a 256; }
+    )
+    _vish_entry="$_vish_dir/${_vish_key%% *}"
+    if [[ -f $_vish_entry ]]; then
+        printf -v _vish_now '%(%s)T' -1
+        _vish_mtime=$(stat -c %Y "$_vish_entry" 2>/dev/null || stat -f %m "$_vish_entry")
+        if (( _vish_ttl <= 0 || _vish_now - _vish_mtime < _vish_ttl )); then
+            cat "$_vish_entry"
+            return 0
+        fi
+    fi
+    if ! mkdir -p "$_vish_dir" || ! _vish_tmp=$(mktemp "$_vish_entry.XXXXXX"); then
+        eval "$_vish_command"
+        return
+    fi
+    eval "$_vish_command" > "$_vish_tmp"
+    _vish_status=$?
+    cat "$_vish_tmp"
+    if (( _vish_status == 0 )); then
+        mv -f "$_vish_tmp" "$_vish_entry"
+    else
+        rm -f "$_vish_tmp"
+    fi
+    return $_vish_status
+}""".split("\n")
+
+VARIABLE_NAME_REGEX = re.compile(r"^[A-Za-z_]\w*$")
+
+@register_node("cached_command", category="Commands", label="Cached Command", description="Runs a command, reusing its output from an on-disk cache")
+class CachedCommandNode(RunCommandNode):
+    def __init__(self):
+        super().__init__("cached_command", "Cached Command", "#27AE60")
+        self.properties["ttl"] = 3600
+        self.properties["env_vars"] = ""
+        self.properties["cache_dir"] = "${XDG_CACHE_HOME:-$HOME/.cache}/vish"
+
+    def emit_bash(self, context: BashContext) -> str:
+        context.require_helper("_vish_cached", CACHED_COMMAND_HELPER)
+        return self._capture(context, self._cached_call())
+
+    def _cached_call(self) -> str:
+        cache_dir = self.properties.get("cache_dir", "") or "${XDG_CACHE_HOME:-$HOME/.cache}/vish"
+        try:
+            ttl = int(str(self.properties.get("ttl", 3600)).strip())
+        except ValueError:
+            ttl = 3600
+        # Names of the environment variables that are part of the key, anything else is ignored
+        env_vars = [
+            name for name in re.split(r"[\s,]+", str(self.properties.get("env_vars", "")))
+            if VARIABLE_NAME_REGEX.match(name)
+        ]
+        return " ".join([f'_vish_cached "{cache_dir}" {ttl} {shlex.quote(self._command())}'] + env_vars)
+
 @register_node("pipe", category="Commands", label="Pipe", description="Pipes output from Command 1 into Command 2")
 class PipeNode(BaseNode):
     def __init__(self):
@@ -49,10 +127,12 @@ class PipeNode(BaseNode):
             source_node = cmd2_port.connected_edges[0].source.node
             cmd2 = source_node.properties.get("value", cmd2)
             
-        return f"{cmd1} | {cmd2}"
+        return context.prefer_builtin(self, f"{cmd1} | {cmd2}")
 
 @register_node("echo", category="Commands", label="Print a text", description="Prints a text to the console")
 class EchoNode(BaseNode):
+    pure = True
+
     def __init__(self):
         super().__init__("echo", "Echo", "#3498DB")
         self.add_input("Exec", PortType.EXEC, "Control flow input")
@@ -66,9 +146,7 @@ class EchoNode(BaseNode):
         text_port = self.inputs[1]
 
         if text_port.connected_edges:
-            source_node = text_port.connected_edges[0].source.node
-
-            value = source_node.emit_bash_value(context)
+            value = context.value_of(text_port.connected_edges[0].source)
             if value is not None:
                 text = value
 
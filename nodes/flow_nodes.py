@@ -6,6 +6,8 @@ from nodes.base_node import BaseNode
 
 @register_node("start", category="Flow", label="Start", description="The starting point of the flow")
 class StartNode(BaseNode):
+    pure = True
+
     def __init__(self):
         super().__init__("start", "Start", "#4A90E2")
         self.add_output("Exec", PortType.EXEC, "Start of the flow")
@@ -15,6 +17,8 @@ class StartNode(BaseNode):
 
 @register_node("if", category="Flow", label="If Condition", description="Evaluates a condition and branches the flow")
 class IfNode(BaseNode):
+    pure = True
+
     def __init__(self):
         super().__init__("if", "If", "#E94B3C")
         self.add_input("Exec", PortType.EXEC, "Control flow input")
@@ -24,11 +28,36 @@ class IfNode(BaseNode):
         self.add_output("Next", PortType.EXEC, "Continue after if")
 
     def emit_bash(self, context: BashContext) -> str:
-        cond = self.inputs[1].get_condition(context)
-        if not cond:
-            Debug.Warn("If Node: No condition connected, skipping if statement.")
-            return ""
+        constant = self._constant_condition(context)
+        if constant is not None:
+            # Only the branch that can run is emitted, without the if around it
+            self._emit_branch(context, 0 if constant else 1)
+        else:
+            cond = self.inputs[1].get_condition(context)
+            if not cond:
+                Debug.Warn("If Node: No condition connected, skipping if statement.")
+                return ""
+
+            self._emit_if(context, cond)
+
+        self.emit_continuation(self.outputs[2], context)
+        return ""
 
+    def get_next_exec_node(self):
+        # The branches and the Next chain are emitted by emit_bash, a dead branch must
+        # not be picked up as the continuation
+        if self.inputs[1].connected_edges:
+            return None
+        return super().get_next_exec_node()
+
+    def _constant_condition(self, context: BashContext):
+        port = self.inputs[1]
+        if not context.optimize or not port.connected_edges:
+            return None
+        return context.constant_of(port.connected_edges[0].source)
+
+    def _emit_if(self, context: BashContext, cond: str):
+        header = context.mark()
         context.add_line(f"if {cond}; then")
         context.indent()
         self._emit_branch(context, 0)
@@ -39,15 +68,11 @@ class IfNode(BaseNode):
             self._emit_branch(context, 1)
             context.dedent()
 
+        if context.optimize and context.mark()[1] == header[1] + 1 + bool(self.outputs[1].connected_edges):
+            # Both branches ended up empty
+            context.truncate(header)
+            return
         context.add_line("fi")
-        next_port = self.outputs[2]
-        if next_port.connected_edges:
-            BaseNode.emit_exec_chain(
-                next_port.connected_edges[0].target.node,
-                context
-            )
-
-        return ""
 
     def _emit_branch(self, context: BashContext, output_index: int):
         port = self.outputs[output_index]
@@ -61,8 +86,10 @@ class IfNode(BaseNode):
 
 @register_node("for", category="Flow", label="For Loop", description="Iterates over a list")
 class ForNode(BaseNode):
-    def __init__(self):
-        super().__init__("for", "For Loop", "#9B59B6")
+    pure = True
+
+    def __init__(self, node_type="for", title="For Loop", color="#9B59B6"):
+        super().__init__(node_type, title, color)
 
         self.add_input("Exec", PortType.EXEC, "Control flow input")
         self.add_input("List", PortType.STRING, "List to iterate over")
@@ -75,32 +102,111 @@ class ForNode(BaseNode):
 
     def emit_bash(self, context: BashContext) -> str:
         var_name = self.properties.get("variable", "item")
+        list_expr = self._list_expression()
+
+        context.set_variable(var_name)
+        header = context.mark()
+        context.add_line(f"for {var_name} in {list_expr}; do")
+        context.indent(isolated=True)
+
+        body_port = self.outputs[0]
+        if body_port.connected_edges:
+            start_node = body_port.connected_edges[0].target.node
+            BaseNode.emit_exec_chain(start_node, context)
+
+        context.dedent()
+        if context.optimize and context.mark()[1] == header[1] + 1:
+            # Empty loop
+            context.truncate(header)
+        else:
+            context.add_line("done")
+
+        self.emit_continuation(self.outputs[2], context)
+        return ""
+
+    def _list_expression(self) -> str:
         list_expr = self.properties.get("list", "*")
 
         list_port = self.inputs[1]
         if list_port.connected_edges:
             source_node = list_port.connected_edges[0].source.node
             list_expr = source_node.properties.get("value", list_expr)
+        return list_expr
 
-        context.add_line(f"for {var_name} in {list_expr}; do")
-        context.indent()
 
+@register_node("parallel_for", category="Flow", label="Parallel For", description="Runs the loop body for each item with several workers")
+class ParallelForNode(ForNode):
+    pure = False
+
+    def __init__(self):
+        super().__init__("parallel_for", "Parallel For", "#8E44AD")
+
+        self.properties["workers"] = 4
+        self.properties["keep_order"] = False
+        self.properties["exit_codes"] = "exit_codes"
+
+    def emit_bash(self, context: BashContext) -> str:
+        # Each item runs in a background subshell. Its exit code (and its output when
+        # keep_order is set) goes to a temporary directory, read back in item order once
+        # every worker is done: the exit_codes array, the exit status of Next is non-zero if an item failed.
+        var_name = self.properties.get("variable", "item")
+        keep_order = parse_flag(self.properties.get("keep_order", False))
+        codes = self.properties.get("exit_codes", "") or context.unique_name("codes")
+        pool = JobPool(context, parse_job_count(self.properties.get("workers", 4)))
+        work_dir = context.unique_name("dir")
+        index = context.unique_name("i")
+        item = context.unique_name("k")
+        code = context.unique_name("code")
+        local = context.local_prefix()
+
+        context.set_variable(var_name)
+        context.set_variable(codes)
+        pool.open()
+        context.add_line(f'{local}{work_dir}="$(mktemp -d)" {index}=0 {item}=0 {code}=0')
+        context.add_line(f"for {var_name} in {self._list_expression()}; do")
+        context.indent(isolated=True)
+        pool.start_job()
+        context.add_line("{")
+        context.indent()
+        context.add_line("(")
+        context.indent()
         body_port = self.outputs[0]
         if body_port.connected_edges:
-            start_node = body_port.connected_edges[0].target.node
-            BaseNode.emit_exec_chain(start_node, context)
+            BaseNode.emit_exec_chain(body_port.connected_edges[0].target.node, context)
+        else:
+            context.add_line(":")
+        context.dedent()
+        redirect = f' > "${work_dir}/${index}.out" 2>&1' if keep_order else ""
+        context.add_line(f"){redirect}")
+        context.add_line(f'echo $? > "${work_dir}/${index}.status"')
+        context.dedent()
+        context.add_line("} &")
+        pool.job_started()
+        context.add_line(f"(( ++{index} ))")
+        context.dedent()
+        context.add_line("done")
+        pool.wait_all()
 
+        context.add_line(f"{codes}=()")
+        context.add_line(f"for (( {item} = 0; {item} < {index}; {item}++ )); do")
+        context.indent()
+        if keep_order:
+            context.add_line(f'cat "${work_dir}/${item}.out"')
+        context.add_line(f'read -r {code} < "${work_dir}/${item}.status"')
+        context.add_line(f'{codes}+=("${code}")')
+        context.add_line(f"(( {code} == 0 )) || {pool.count_failure()}")
         context.dedent()
         context.add_line("done")
+        context.add_line(f'rm -rf "${work_dir}"')
+        context.add_line(pool.succeeded())
 
-        next_port = self.outputs[2]
-        if next_port.connected_edges:
-            start_node = next_port.connected_edges[0].target.node
-            BaseNode.emit_exec_chain(start_node, context)
+        self.emit_continuation(self.outputs[2], context)
         return ""
     
 @register_node("while", category="Flow", label="While Loop", description="Repeats execution while a condition is true")
 class WhileNode(BaseNode):
+    pure = True
+
     def __init__(self):
         super().__init__("while", "While", "#8E44AD")
         self.add_input("Exec", PortType.EXEC, "Control flow input")
@@ -109,13 +215,28 @@ class WhileNode(BaseNode):
         self.add_output("Next", PortType.EXEC, "Continue after loop")
 
     def emit_bash(self, context: BashContext) -> str:
-        cond = self.inputs[1].get_condition(context)
+        # Evaluated on every iteration, can't be computed once before the loop
+        with context.inline_values():
+            cond = self.inputs[1].get_condition(context)
         if not cond:
             Debug.Warn("While Node: No condition connected, skipping while loop.")
             return ""
 
+        condition_port = self.inputs[1]
+        never_runs = (
+            context.optimize
+            and context.constant_of(condition_port.connected_edges[0].source) is False
+        )
+        if not never_runs:
+            self._emit_loop(context, cond)
+
+        self.emit_continuation(self.outputs[1], context)
+        return ""
+
+    def _emit_loop(self, context: BashContext, cond: str):
+        header = context.mark()
         context.add_line(f"while {cond}; do")
-        context.indent()
+        context.indent(isolated=True)
 
         body_port = self.outputs[0]
         if body_port.connected_edges:
@@ -126,22 +247,133 @@ class WhileNode(BaseNode):
             )
 
         context.dedent()
-        context.add_line("done")
+        if context.optimize and context.mark()[1] == header[1] + 1:
+            # Empty loop, only its condition would run
+            context.truncate(header)
+        else:
+            context.add_line("done")
 
-        next_port = self.outputs[1]
-        if next_port.connected_edges:
-            BaseNode.emit_exec_chain(
-                next_port.connected_edges[0].target.node,
-                context
-            )
+    def get_next_exec_node(self):
+        return None
+    
+@register_node("parallel", category="Flow", label="Parallel", description="Runs branches as background jobs and joins them")
+class ParallelNode(BaseNode):
+    BRANCHES = 4
 
+    def __init__(self):
+        super().__init__("parallel", "Parallel", "#16A085")
+        self.add_input("Exec", PortType.EXEC, "Control flow input")
+        for i in range(1, self.BRANCHES + 1):
+            self.add_output(f"Branch {i}", PortType.EXEC, "Runs in the background")
+        self.add_output("Join", PortType.EXEC, "Continues once every branch is done, with a non-zero exit status if one of them failed")
+
+        self.properties["max_jobs"] = 4
+
+    def emit_bash(self, context: BashContext) -> str:
+        branches = [port for port in self.outputs[:self.BRANCHES] if port.connected_edges]
+        max_jobs = parse_job_count(self.properties.get("max_jobs", 4))
+        pool = JobPool(context, max_jobs if max_jobs < len(branches) else 0)
+
+        if branches:
+            pool.open()
+            for port in branches:
+                pool.start_job()
+                context.add_line("(")
+                context.indent()
+                BaseNode.emit_exec_chain(port.connected_edges[0].target.node, context)
+                context.dedent()
+                context.add_line(") &")
+                pool.job_started()
+            pool.join()
+
+        self.emit_continuation(self.outputs[self.BRANCHES], context)
         return ""
 
     def get_next_exec_node(self):
         return None
-    
+
+
+def parse_flag(value) -> bool:
+    # Properties edited in the panel come back as strings
+    return str(value).strip().lower() in ("true", "1", "yes", "on")
+
+
+def parse_job_count(value) -> int:
+    # 0 (or anything that isn't a positive number) means no limit
+    try:
+        return max(0, int(str(value).strip()))
+    except ValueError:
+        return 0
+
+
+# _vish_reap POOL waits for one job of POOL (the name of an array of PIDs), removes it from the
+# array and returns its exit status. Background jobs that aren't in POOL are left alone: with bash
+# 5.1 "wait -n -p" takes the first of the pool's jobs to finish, before that the oldest one is waited for.
+REAP_HELPER = r"""_vish_reap() {
+    local -n _vish_pool=$1
+    local _vish_pid _vish_status _vish_i
+    if (( BASH_VERSINFO[0] > 5 || (BASH_VERSINFO[0] == 5 && BASH_VERSINFO[1] >= 1) )); then
+        wait -n -p _vish_pid "${_vish_pool[@]}"
+    else
+        _vish_pid=${_vish_pool[0]}
+        wait "$_vish_pid"
+    fi
+    _vish_status=$?
+    for _vish_i in "${!_vish_pool[@]}"; do
+        [[ ${_vish_pool[_vish_i]} == "$_vish_pid" ]] && unset '_vish_pool[_vish_i]'
+    done
+    _vish_pool=("${_vish_pool[@]}")
+    return $_vish_status
+}""".split("\n")
+
+
+class JobPool:
+    # Bounded pool of background jobs in the generated script: at most max_jobs run at
+    # once, _vish_reap frees a slot. The PIDs of the pool's jobs are kept in an array so that
+    # other background jobs of the script are never waited for. A failed job is counted,
+    # join() waits for the rest and its exit status is non-zero if any job failed.
+    # Needs bash 4.3 (namerefs).
+    def __init__(self, context: BashContext, max_jobs: int):
+        self.context = context
+        self.max_jobs = max_jobs
+        self.jobs = context.unique_name("pids")
+        self.failed = context.unique_name("failed")
+
+    def open(self):
+        self.context.require_helper("_vish_reap", REAP_HELPER)
+        local = self.context.local_prefix()
+        self.context.add_line(f"{local}{self.jobs}=() {self.failed}=0")
+
+    def start_job(self):
+        if self.max_jobs:
+            self.context.add_line(
+                f"if (( ${{#{self.jobs}[@]}} >= {self.max_jobs} )); then {self._reap()}; fi"
+            )
+
+    def job_started(self):
+        self.context.add_line(f"{self.jobs}+=($!)")
+
+    def join(self):
+        self.wait_all()
+        self.context.add_line(self.succeeded())
+
+    def wait_all(self):
+        self.context.add_line(f"while (( ${{#{self.jobs}[@]}} > 0 )); do {self._reap()}; done")
+
+    def succeeded(self) -> str:
+        return f"(( {self.failed} == 0 ))"
+
+    def count_failure(self) -> str:
+        return f"(( ++{self.failed} ))"
+
+    def _reap(self) -> str:
+        return f"_vish_reap {self.jobs} || {self.count_failure()}"
+
+
 @register_node("function", category="Flow", label="Function", description="Defines a bash function")
 class FunctionNode(BaseNode):
+    pure = True
+
     def __init__(self):
         super().__init__("function", "Function", "#1ABC9C")
         self.add_output("Exec", PortType.EXEC, "Function body")
@@ -155,12 +387,14 @@ class FunctionNode(BaseNode):
         prev_buffer = context._current_buffer
         prev_indent = context.indent_level
         context._current_buffer = "function"
-        context.indent_level = 1
+        context.indent_level = 0
+        context.indent(isolated=True)
 
         body_port = self.outputs[0]
         if body_port.connected_edges:
             start_node = body_port.connected_edges[0].target.node
             BaseNode.emit_exec_chain(start_node, context)
+        context.dedent()
         context.indent_level = prev_indent
         context._current_buffer = prev_buffer
 
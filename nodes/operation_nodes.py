@@ -1,14 +1,52 @@
+import re
 from nodes.base_node import BaseNode
 from core.port_types import PortType
 from core.bash_context import BashContext
+from core.builtin_rewrites import quote_operand
 from nodes.registry import register_node
 
+DECIMAL_REGEX = re.compile(r"^-?(0|[1-9][0-9]*)$")
+INT64_MIN, INT64_MAX = -2 ** 63, 2 ** 63 - 1
+
 class MathNode(BaseNode):
     def _resolve(self, port, context: BashContext, default="0"):
         if port.connected_edges:
-            return port.connected_edges[0].source.node.emit_bash_value(context)
+            return context.value_of(port.connected_edges[0].source)
+        return default
+
+    def _constant(self, port, context: BashContext, default=0):
+        if port.connected_edges:
+            return context.constant_of(port.connected_edges[0].source)
         return default
 
+    def _int_constants(self, context: BashContext):
+        a = self._constant(self.inputs[0], context)
+        b = self._constant(self.inputs[1], context)
+        if type(a) is int and type(b) is int:
+            return a, b
+        return None
+
+    def _fold(self, context: BashContext, operation):
+        operands = self._int_constants(context)
+        if operands is None:
+            return None
+        result = operation(*operands)
+        # Left to bash when it would wrap around or fail (division by zero)
+        if result is None or not INT64_MIN <= result <= INT64_MAX:
+            return None
+        return result
+
+    def _condition_constants(self, context: BashContext):
+        # Unconnected condition inputs are emitted as "false"
+        return [self._constant(port, context, default=False) for port in self.inputs]
+
+def truncated_division(a, b):
+    # Bash rounds toward zero, python floors
+    if b == 0:
+        return None
+    q = abs(a) // abs(b)
+    return q if (a < 0) == (b < 0) else -q
+
 @register_node("number_constant", category="Constants", label="Number Constant", description="Represents a number constant value")
 class NumberConstant(MathNode):
     def __init__(self):
@@ -19,6 +57,13 @@ class NumberConstant(MathNode):
     def emit_bash_value(self, context: BashContext) -> str:
         return str(self.properties.get("value", 0))
 
+    def constant_value(self, context: BashContext):
+        # Only plain decimals: bash reads 010 as octal and rejects 08 or 1_000
+        value = str(self.properties.get("value", 0)).strip()
+        if DECIMAL_REGEX.match(value) and INT64_MIN <= int(value) <= INT64_MAX:
+            return int(value)
+        return None
+
 @register_node("addition", category="Math", label="Addition")
 class Addition(MathNode):
     def __init__(self):
@@ -32,6 +77,9 @@ class Addition(MathNode):
         b = self._resolve(self.inputs[1], context)
         return f"$(({a} + {b}))"
 
+    def constant_value(self, context: BashContext):
+        return self._fold(context, lambda a, b: a + b)
+
 @register_node("subtraction", category="Math", label="Subtraction")
 class Subtraction(MathNode):
     def __init__(self):
@@ -45,6 +93,9 @@ class Subtraction(MathNode):
         b = self._resolve(self.inputs[1], context)
         return f"$(({a} - {b}))"
 
+    def constant_value(self, context: BashContext):
+        return self._fold(context, lambda a, b: a - b)
+
 @register_node("multiplication", category="Math", label="Multiplication")
 class Multiplication(MathNode):
     def __init__(self):
@@ -58,6 +109,9 @@ class Multiplication(MathNode):
         b = self._resolve(self.inputs[1], context)
         return f"$(({a} * {b}))"
 
+    def constant_value(self, context: BashContext):
+        return self._fold(context, lambda a, b: a * b)
+
 @register_node("division", category="Math", label="Division")
 class Division(MathNode):
     def __init__(self):
@@ -71,6 +125,9 @@ class Division(MathNode):
         b = self._resolve(self.inputs[1], context)
         return f"$(({a} / {b}))"
 
+    def constant_value(self, context: BashContext):
+        return self._fold(context, truncated_division)
+
 @register_node("modulo", category="Math", label="Modulo", description="Calculates the remainder of the division")
 class Modulo(MathNode):
     def __init__(self):
@@ -84,6 +141,9 @@ class Modulo(MathNode):
         b = self._resolve(self.inputs[1], context)
         return f"$(({a} % {b}))"
 
+    def constant_value(self, context: BashContext):
+        return self._fold(context, lambda a, b: None if b == 0 else a - b * truncated_division(a, b))
+
 @register_node("less_than", category="Logic", label="Less Than", description="Is A less than B?")
 class LessThan(MathNode):
     def __init__(self):
@@ -97,6 +157,10 @@ class LessThan(MathNode):
         b = self._resolve(self.inputs[1], context)
         return f"(( {a} < {b} ))"
 
+    def constant_value(self, context: BashContext):
+        operands = self._int_constants(context)
+        return None if operands is None else operands[0] < operands[1]
+
 @register_node("greater_than", category="Logic", label="Greater Than", description="Is A greater than B?")
 class GreaterThan(MathNode):
     def __init__(self):
@@ -110,6 +174,10 @@ class GreaterThan(MathNode):
         b = self._resolve(self.inputs[1], context)
         return f"(( {a} > {b} ))"
 
+    def constant_value(self, context: BashContext):
+        operands = self._int_constants(context)
+        return None if operands is None else operands[0] > operands[1]
+
 @register_node("equals", category="Logic", label="Equals (numeric)")
 class EqualsNumeric(MathNode):
     def __init__(self):
@@ -123,6 +191,10 @@ class EqualsNumeric(MathNode):
         b = self._resolve(self.inputs[1], context)
         return f"(( {a} == {b} ))"
 
+    def constant_value(self, context: BashContext):
+        operands = self._int_constants(context)
+        return None if operands is None else operands[0] == operands[1]
+
 @register_node("equals_string", category="Logic", label="Equals (string)")
 class EqualsString(MathNode):
     def __init__(self):
@@ -134,7 +206,17 @@ class EqualsString(MathNode):
     def emit_condition(self, context: BashContext) -> str:
         a = self._resolve(self.inputs[0], context)
         b = self._resolve(self.inputs[1], context)
-        return f"[ {a} = {b} ]"
+        test = f"[ {a} = {b} ]"
+        if context.prefer_builtins:
+            return context.record_rewrite(self, test, f"[[ {a} == {quote_operand(b)} ]]")
+        return test
+
+    def constant_value(self, context: BashContext):
+        a = self._constant(self.inputs[0], context, default="0")
+        b = self._constant(self.inputs[1], context, default="0")
+        if isinstance(a, str) and isinstance(b, str):
+            return a == b
+        return None
 
 @register_node("equals_variable", category="Logic", label="Equals (variable)")
 class EqualsVariable(MathNode):
@@ -147,7 +229,10 @@ class EqualsVariable(MathNode):
     def emit_condition(self, context: BashContext) -> str:
         a = self._resolve(self.inputs[0], context)
         b = self._resolve(self.inputs[1], context)
-        return f"[ \"{a}\" = {b} ]"
+        test = f"[ \"{a}\" = {b} ]"
+        if context.prefer_builtins:
+            return context.record_rewrite(self, test, f"[[ \"{a}\" == {quote_operand(b)} ]]")
+        return test
 
 @register_node("logical_and", category="Logic", label="AND")
 class LogicalAnd(MathNode):
@@ -158,6 +243,14 @@ class LogicalAnd(MathNode):
         self.add_output("Result", PortType.CONDITION, "Result")
 
     def emit_condition(self, context: BashContext) -> str:
+        if context.optimize:
+            # A true operand doesn't change the result
+            a_const, b_const = self._condition_constants(context)
+            if a_const is True:
+                return self.inputs[1].get_condition(context) or "false"
+            if b_const is True:
+                return self.inputs[0].get_condition(context) or "false"
+
         a = self.inputs[0].get_condition(context)
         b = self.inputs[1].get_condition(context)
         if not a:
@@ -166,6 +259,14 @@ class LogicalAnd(MathNode):
             b = "false"
         return f"{a} && {b}"
 
+    def constant_value(self, context: BashContext):
+        a, b = self._condition_constants(context)
+        if a is False or b is False:
+            return False
+        if a is True and b is True:
+            return True
+        return None
+
 @register_node("logical_or", category="Logic", label="OR")
 class LogicalOr(MathNode):
     def __init__(self):
@@ -175,6 +276,14 @@ class LogicalOr(MathNode):
         self.add_output("Result", PortType.CONDITION, "Result")
 
     def emit_condition(self, context: BashContext) -> str:
+        if context.optimize:
+            # A false operand doesn't change the result
+            a_const, b_const = self._condition_constants(context)
+            if a_const is False:
+                return self.inputs[1].get_condition(context) or "false"
+            if b_const is False:
+                return self.inputs[0].get_condition(context) or "false"
+
         a = self.inputs[0].get_condition(context)
         b = self.inputs[1].get_condition(context)
         if not a:
@@ -183,6 +292,14 @@ class LogicalOr(MathNode):
             b = "false"
         return f"{a} || {b}"
 
+    def constant_value(self, context: BashContext):
+        a, b = self._condition_constants(context)
+        if a is True or b is True:
+            return True
+        if a is False and b is False:
+            return False
+        return None
+
 @register_node("logical_not", category="Logic", label="NOT")
 class LogicalNot(MathNode):
     def __init__(self):
@@ -196,6 +313,10 @@ class LogicalNot(MathNode):
             a = "false"
         return f"! {a}"
 
+    def constant_value(self, context: BashContext):
+        a = self._condition_constants(context)[0]
+        return None if a is None else not a
+
 @register_node("command_condition", category="Logic", label="Command Condition", description="Uses a custom command as a condition")
 class CommandConditionNode(BaseNode):
     def __init__(self):
@@ -204,4 +325,4 @@ class CommandConditionNode(BaseNode):
         self.properties["command"] = ""
 
     def emit_condition(self, context: BashContext) -> str:
-        return f"[ {self.properties['command']} ]"
\ No newline at end of file
+        return f"[ {context.prefer_builtin(self, self.properties['command'])} ]"
\ No newline at end of file
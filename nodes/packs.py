@@ -0,0 +1,92 @@
+import json
+import os
+from pathlib import Path
+from typing import List
+from core.debug import Debug, Info
+from core.port_types import PortType
+from nodes.registry import NODE_REGISTRY, register_lazy_node
+
+# Node packs: directories holding a manifest.json that lists their node types.
+#
+#   {
+#       "name": "docker",
+#       "nodes": [
+#           {
+#               "type": "docker_run", "label": "Docker Run", "category": "Docker",
+#               "description": "Runs a container", "module": "nodes.py", "class": "DockerRunNode",
+#               "inputs": [{"name": "Exec", "type": "exec"}, {"name": "Image", "type": "string"}],
+#               "outputs": [{"name": "Exec", "type": "exec"}]
+#           }
+#       ]
+#   }
+#
+# Loading a pack only reads its manifest: the node types show up in the palette right away and
+# "module" (relative to the pack directory) is imported when a node of the type is first created
+# or loaded from a graph. The class is a BaseNode subclass, like the built-in nodes.
+MANIFEST = "manifest.json"
+PACKS_ENV = "VISH_PACKS"
+PORT_TYPES = {port_type.value for port_type in PortType}
+
+
+def pack_directories() -> List[Path]:
+    # Bundled packs, the user's packs, then the ones listed in $VISH_PACKS
+    data_home = os.environ.get("XDG_DATA_HOME") or os.path.join(Path.home(), ".local", "share")
+    roots = [Path(Info.resource_path("packs")), Path(data_home) / "vish" / "packs"]
+    roots += [Path(path) for path in os.environ.get(PACKS_ENV, "").split(os.pathsep) if path]
+
+    directories = []
+    for root in roots:
+        if (root / MANIFEST).is_file():
+            directories.append(root)
+        elif root.is_dir():
+            directories += sorted(path for path in root.iterdir() if (path / MANIFEST).is_file())
+    return directories
+
+
+def load_node_packs(directories=None) -> int:
+    # Registers the node types of every pack, returns how many were added
+    added = 0
+    for directory in pack_directories() if directories is None else directories:
+        try:
+            added += load_pack(Path(directory))
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            Debug.Warn(f"Cannot load node pack {directory}: {e}")
+    return added
+
+
+def load_pack(directory: Path) -> int:
+    manifest = json.loads((directory / MANIFEST).read_text(encoding="utf-8"))
+    pack = manifest.get("name") or directory.name
+    if not pack.isidentifier():
+        raise ValueError(f"invalid pack name {pack!r}")
+
+    # Everything is checked before registering, a broken manifest adds nothing
+    declared = []
+    for node in manifest["nodes"]:
+        node_type = node["type"]
+        if node_type in NODE_REGISTRY:
+            Debug.Warn(f"Node pack {pack}: node type {node_type} is already registered, ignoring it")
+            continue
+        for port in node.get("inputs", []) + node.get("outputs", []):
+            if port["type"] not in PORT_TYPES:
+                raise ValueError(f"{node_type}: unknown port type {port['type']!r}")
+
+        module = Path(node["module"])
+        if module.is_absolute() or ".." in module.parts:
+            raise ValueError(f"{node_type}: module must be inside the pack")
+        declared.append(dict(
+            node_type=node_type,
+            label=node.get("label", node_type),
+            category=node.get("category", "Other"),
+            description=node.get("description", ""),
+            pack=pack,
+            module_name=".".join(["vish_packs", pack, *module.with_suffix("").parts]),
+            module_path=str(directory / module),
+            class_name=node["class"],
+            inputs=node.get("inputs", []),
+            outputs=node.get("outputs", []),
+        ))
+
+    for node in declared:
+        register_lazy_node(**node)
+    return len(declared)
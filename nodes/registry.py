@@ -1,7 +1,16 @@
+import importlib.util
+import sys
+from core.debug import Debug
+
 NODE_REGISTRY = {}
 
 def register_node(node_type: str, *, label=None, category="Other", description=""):
     def decorator(cls):
+        entry = NODE_REGISTRY.get(node_type)
+        if entry is not None and entry.get("pack"):
+            # Declared by a pack manifest (see nodes.packs): its metadata stays, the class is now known
+            entry["class"] = cls
+            return cls
         NODE_REGISTRY[node_type] = {
             "class": cls,
             "label": label or cls.__name__,
@@ -11,8 +20,75 @@ def register_node(node_type: str, *, label=None, category="Other", description="
         return cls
     return decorator
 
+def register_lazy_node(node_type: str, *, label, category, description, pack, module_name, module_path, class_name, inputs=(), outputs=()):
+    # A node type from a pack: listed right away, its module is only imported by node_class
+    NODE_REGISTRY[node_type] = {
+        "class": None,
+        "label": label,
+        "category": category,
+        "description": description,
+        "pack": pack,
+        "module_name": module_name,
+        "module_path": module_path,
+        "class_name": class_name,
+        "inputs": list(inputs),
+        "outputs": list(outputs),
+    }
+
+def node_class(node_type):
+    # Class of a registered node type, importing its pack module on first use. None if unknown
+    entry = NODE_REGISTRY.get(node_type)
+    if entry is None:
+        return None
+    if entry["class"] is None:
+        module = _import_pack_module(entry["module_name"], entry["module_path"])
+        cls = getattr(module, entry["class_name"], None)
+        if cls is None:
+            raise ImportError(f"{entry['module_path']} has no class {entry['class_name']}")
+        entry["class"] = cls
+    return entry["class"]
+
+def _import_pack_module(name: str, module_path: str):
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.spec_from_file_location(name, module_path)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"Cannot import {module_path}")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[name]
+        raise
+    return module
+
 def create_node(node_type):
     entry = NODE_REGISTRY.get(node_type)
     if not entry:
         raise ValueError(f"Unknown node type: {node_type}")
-    return entry["class"]()
+    try:
+        cls = node_class(node_type)
+    except Exception as e:
+        raise ValueError(f"Cannot load node type {node_type}: {e}")
+    return _check_ports(entry, cls())
+
+def _check_ports(entry, node):
+    # The ports a manifest declares are what the palette shows before the class is imported
+    if entry.get("pack") and not entry.get("ports_checked"):
+        entry["ports_checked"] = True
+        inputs = [port.port_type.value for port in node.inputs]
+        outputs = [port.port_type.value for port in node.outputs]
+        if inputs != [port["type"] for port in entry["inputs"]] or outputs != [port["type"] for port in entry["outputs"]]:
+            Debug.Warn(f"Node type {node.node_type}: ports differ from the {entry['pack']} manifest")
+    return node
+
+class NodeFactory:
+    @staticmethod
+    def create_node(node_type: str):
+        # None for an unknown type, ValueError when the module of a pack node fails to import
+        try:
+            cls = node_class(node_type)
+        except Exception as e:
+            raise ValueError(f"Cannot load node type {node_type}: {e}")
+        return _check_ports(NODE_REGISTRY[node_type], cls()) if cls else None
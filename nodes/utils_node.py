@@ -39,6 +39,8 @@ class ToInt(BaseNode):
 
 @register_node("sleep", category="Utilities", label="Sleep", description="Pauses execution for a specified duration")
 class SleepNode(BaseNode):
+    pure = True
+
     def __init__(self):
         super().__init__("sleep", "Sleep", "#E67E22")
         self.add_input("Exec", PortType.EXEC, "Control flow input")
@@ -54,7 +56,16 @@ class SleepNode(BaseNode):
             source_node = duration_port.connected_edges[0].source.node
             duration = source_node.properties.get("value", duration)
 
+        if context.optimize and self._is_zero(duration):
+            return ""
         return f'sleep {duration}'
+
+    @staticmethod
+    def _is_zero(duration) -> bool:
+        try:
+            return float(str(duration).strip()) == 0
+        except ValueError:
+            return False
     
 @register_node("download_file", category="Utilities", label="Download File", description="Downloads a file from a specified URL")
 class DownloadFileNode(BaseNode):
@@ -5,6 +5,8 @@ from .base_node import BaseNode
 
 @register_node("set_variable", category="Variables", label="Set Variable", description="Sets a variable to a specific value")
 class SetVariableNode(BaseNode):
+    pure = True # reports its assignment through context.set_variable
+
     def __init__(self):
         super().__init__("set_variable", "Set Variable", "#F39C12")
         self.add_input("Exec", PortType.EXEC, "Control flow input")
@@ -19,20 +21,18 @@ class SetVariableNode(BaseNode):
 
         raw_value = self.properties.get("value", "")
         if raw_value.isdigit() or raw_value.startswith("$") or raw_value.startswith('"') or raw_value.startswith("'") or raw_value.startswith('`'):
-            value_expr = raw_value
+            value_expr = context.prefer_builtin(self, raw_value)
         else:
             value_expr = f'"{raw_value}"'
 
 
         value_port = self.inputs[1]
         if value_port.connected_edges:
-            source_node = value_port.connected_edges[0].source.node
-
-            emitted = source_node.emit_bash_value(context)
+            emitted = context.value_of(value_port.connected_edges[0].source)
             if emitted is not None:
                 value_expr = emitted
 
-        context.variables[var_name] = value_expr
+        context.set_variable(var_name, value_expr)
         return f'{var_name}={value_expr}'
 
 @register_node("get_variable", category="Variables", label="Get Variable", description="Gets the value of a variable")
@@ -65,7 +65,10 @@ class FileExistsNode(BaseNode):
             source_node = path_port.connected_edges[0].source.node
             path = source_node.properties.get("value", path)
         
-        return f'[ -f "{path}" ]'
+        test = f'[ -f "{path}" ]'
+        if context.prefer_builtins:
+            return context.record_rewrite(self, test, f'[[ -f "{path}" ]]')
+        return test
     
 @register_node("string_constant", category="Constants", label="String Constant", description="Represents a string constant value")
 class StringConstantNode(BaseNode):
@@ -75,4 +78,11 @@ class StringConstantNode(BaseNode):
         self.properties["value"] = ""
 
     def emit_bash_value(self, context: BashContext) -> str:
-        return f'"{self.properties.get("value", "")}"'
\ No newline at end of file
+        return f'"{self.properties.get("value", "")}"'
+
+    def constant_value(self, context: BashContext):
+        value = str(self.properties.get("value", ""))
+        # Anything bash would expand inside double quotes is only known at run time
+        if any(c in value for c in '$`\\"!'):
+            return None
+        return value
@@ -0,0 +1,122 @@
+import shutil
+import subprocess
+import pytest
+from core.graph import Graph
+from core.bash_emitter import BashEmitter, IncrementalBashEmitter
+from core.config import Config
+from nodes import flow_nodes, command_nodes, variable_nodes, operation_nodes, utils_node
+from nodes.flow_nodes import ParallelNode
+from nodes.registry import NODE_REGISTRY
+
+pytestmark = pytest.mark.skipif(shutil.which("bash") is None, reason="needs bash")
+
+
+def add(graph, node_type, **properties):
+    node = NODE_REGISTRY[node_type]["class"]()
+    node.properties.update(properties)
+    graph.add_node(node)
+    return node
+
+
+def connect(graph, source, target):
+    assert graph.add_edge(source, target)
+
+
+def run(graph, level, monkeypatch):
+    monkeypatch.setattr(Config, "OPTIMIZATION_LEVEL", level)
+    script = BashEmitter(graph).emit()
+    return subprocess.run(["bash", "-c", script], capture_output=True, text=True, timeout=10).stdout
+
+
+def test_loop_body_does_not_reuse_outer_temporaries(monkeypatch):
+    # V == "1" is read twice and NOT(V == "1") is read by an If before a For and by an If in its
+    # body, which sets V=2 after it: the second iteration has to test V again
+    graph = Graph()
+    start = add(graph, "start")
+    set_one = add(graph, "set_variable", variable="V", value="1")
+    get = add(graph, "get_variable", variable="V")
+    one = add(graph, "string_constant", value="1")
+    equals = add(graph, "equals_variable")
+    negate = add(graph, "logical_not")
+    connect(graph, get.outputs[0], equals.inputs[0])
+    connect(graph, one.outputs[0], equals.inputs[1])
+    connect(graph, equals.outputs[0], negate.inputs[0])
+
+    equals_if = add(graph, "if")
+    connect(graph, equals.outputs[0], equals_if.inputs[1])
+    connect(graph, equals_if.outputs[0], add(graph, "echo", text="E").inputs[0])
+    outer_if = add(graph, "if")
+    connect(graph, negate.outputs[0], outer_if.inputs[1])
+    connect(graph, outer_if.outputs[0], add(graph, "echo", text="A").inputs[0])
+
+    loop = add(graph, "for", variable="i", list="a b")
+    inner_if = add(graph, "if")
+    connect(graph, negate.outputs[0], inner_if.inputs[1])
+    connect(graph, inner_if.outputs[0], add(graph, "echo", text="B").inputs[0])
+    set_two = add(graph, "set_variable", variable="V", value="2")
+
+    connect(graph, start.get_exec_output(), set_one.get_exec_input())
+    connect(graph, set_one.get_exec_output(), equals_if.get_exec_input())
+    connect(graph, equals_if.outputs[2], outer_if.get_exec_input())
+    connect(graph, outer_if.outputs[2], loop.get_exec_input())
+    connect(graph, loop.outputs[0], inner_if.get_exec_input())
+    connect(graph, inner_if.outputs[2], set_two.get_exec_input())
+
+    assert run(graph, 0, monkeypatch) == "E\nB\n"
+    assert run(graph, 1, monkeypatch) == "E\nB\n"
+
+
+def test_command_output_is_captured_once(tmp_path, monkeypatch):
+    # Both operands read Output: the command still runs once, where the exec chain runs it
+    graph = Graph()
+    start = add(graph, "start")
+    log = tmp_path / "runs"
+    command = add(graph, "run_command", command=f"echo run >> {log}; echo out")
+    equals = add(graph, "equals_string")
+    connect(graph, command.outputs[1], equals.inputs[0])
+    connect(graph, command.outputs[1], equals.inputs[1])
+    check = add(graph, "if")
+    connect(graph, equals.outputs[0], check.inputs[1])
+    connect(graph, check.outputs[0], add(graph, "echo", text="same").inputs[0])
+    connect(graph, start.get_exec_output(), command.get_exec_input())
+    connect(graph, command.get_exec_output(), check.get_exec_input())
+
+    for level in (0, 1):
+        log.unlink(missing_ok=True)
+        assert run(graph, level, monkeypatch) == "same\n"
+        assert log.read_text() == "run\n"
+
+
+def test_job_pool_ignores_jobs_started_before_it(monkeypatch):
+    # A failing background job from before the Parallel node is not one of its branches
+    graph = Graph()
+    start = add(graph, "start")
+    outside = add(graph, "run_command", command="(sleep 0.2; exit 3) &")
+    parallel = add(graph, "parallel", max_jobs=1)
+    for i, port in enumerate(parallel.outputs[:3]):
+        branch = add(graph, "run_command", command=f"sleep 0.{i + 1}")
+        connect(graph, port, branch.get_exec_input())
+    status = add(graph, "run_command", command='echo "status $?"; wait')
+    connect(graph, start.get_exec_output(), outside.get_exec_input())
+    connect(graph, outside.get_exec_output(), parallel.get_exec_input())
+    connect(graph, parallel.outputs[ParallelNode.BRANCHES], status.get_exec_input())
+
+    assert run(graph, 1, monkeypatch) == "status 0\n"
+
+
+def test_patches_keep_builtin_rewrites_up_to_date(monkeypatch):
+    monkeypatch.setattr(Config, "PREFER_BUILTINS", True)
+    graph = Graph()
+    start = add(graph, "start")
+    command = add(graph, "run_command", command="echo $(cat a)")
+    connect(graph, start.get_exec_output(), command.get_exec_input())
+
+    emitter = IncrementalBashEmitter(graph)
+    emitter.emit()
+    command.properties["command"] = "echo $(cat b)"
+    graph.mark_dirty(command.id)
+    assert emitter.update(allow_full=False)
+
+    full = IncrementalBashEmitter(graph)
+    assert emitter.script == full.emit()
+    assert emitter.rewrites == full.rewrites == [(command.id, "$(cat b)", "$(<b)")]
@@ -0,0 +1,21 @@
+import shutil
+import subprocess
+import pytest
+from core.builtin_rewrites import rewrite_command
+
+
+@pytest.mark.parametrize("arguments", ["1 + 2", "7 / -2", "-7 % 2", "\\( 1 + 2 \\) \\* 3", "010 + 1"])
+@pytest.mark.skipif(shutil.which("expr") is None, reason="needs expr")
+def test_expr_literals_fold_to_what_expr_prints(arguments):
+    command = f"echo $(expr {arguments})"
+    rewritten, rewrites = rewrite_command(command)
+    assert rewrites
+    expected = subprocess.run(["bash", "-c", command], capture_output=True, text=True).stdout
+    assert rewritten == "echo " + expected.strip()
+
+
+@pytest.mark.parametrize("arguments", ["2 - 2", "1 / 0", "$n + 1", "$1 \\* 2", "9223372036854775807 + 1"])
+def test_expr_is_kept_when_status_or_operands_differ(arguments):
+    # A 0 result makes expr exit with 1, variables may hold anything
+    command = f"x=$(expr {arguments})"
+    assert rewrite_command(command) == (command, [])
@@ -1,7 +1,9 @@
 from PySide6.QtWidgets import QGraphicsPathItem
 from PySide6.QtCore import QPointF, Qt
-from PySide6.QtGui import QPainterPath, QPen, QColor
+from PySide6.QtGui import QPainter, QPainterPath, QPen, QColor
 from core.graph import Edge
+from core.config import Config
+from ui.lod import level_of_detail
 
 class EdgeItem(QGraphicsPathItem):
     def __init__(self, edge=None, source_port=None, target_port=None):
@@ -18,6 +20,15 @@ class EdgeItem(QGraphicsPathItem):
         self.setPen(pen)
         self.setZValue(-1)
 
+    def paint(self, painter, option, widget=None):
+        if level_of_detail(painter, option) >= Config.LOD_STRAIGHT_EDGES:
+            super().paint(painter, option, widget)
+            return
+        # Zoomed out: straight line, the curve's bounding rect contains it
+        painter.setRenderHint(QPainter.Antialiasing, False)
+        painter.setPen(self.pen())
+        painter.drawLine(self.source_pos, self.target_pos)
+
     def update_positions(self):
         if self.source_port:
             self.source_pos = self.source_port.center_scene_pos()
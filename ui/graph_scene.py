@@ -2,9 +2,10 @@ from PySide6.QtWidgets import QGraphicsScene
 from PySide6.QtCore import Signal, QTimer
 from PySide6.QtGui import QCursor, QPen, QColor
 from core.debug import Debug
-from ui import edge_item
 from ui.edge_item import EdgeItem
 from ui.port_item import PortItem
+from ui.node_item import NodeItem
+from commands.undo_commands import MoveNodeCommand
 from core.port_types import PortDirection
 from core.validator import GraphValidator
 from core.config import Config
@@ -14,25 +15,58 @@ class GraphScene(QGraphicsScene):
     connection_created = Signal(object, object)
     graph_changed = Signal() 
 
+    FRAME_MS = 16
+
     def __init__(self, graph):
         super().__init__()
         self.graph = graph
-        self.edges = []
+        # Edge items in insertion order (used as an ordered set), and the edge items of every port
+        self.edges = {}
+        self.port_edges = {}
         self.drag_edge = None
         self.start_port = None
         self.pending_port = None
         self.pending_scene_pos = None
+
+        # Batched moves: while several nodes are dragged, edges are collected and
+        # updated once per frame instead of once per node and mouse event
+        self._move_start = {}
+        self._dirty_edges = {}
+        self._edge_timer = QTimer(self)
+        self._edge_timer.setSingleShot(True)
+        self._edge_timer.setInterval(self.FRAME_MS)
+        self._edge_timer.timeout.connect(self.flush_edge_updates)
         self.setBackgroundBrush(self.palette().dark())
 
+    def register_edge_item(self, edge_item):
+        self.edges[edge_item] = None
+        for port_item in (edge_item.source_port, edge_item.target_port):
+            self.port_edges.setdefault(port_item, []).append(edge_item)
+
+    def unregister_edge_item(self, edge_item):
+        self.edges.pop(edge_item, None)
+        for port_item in (edge_item.source_port, edge_item.target_port):
+            port_edges = self.port_edges.get(port_item)
+            if port_edges and edge_item in port_edges:
+                port_edges.remove(edge_item)
+                if not port_edges:
+                    del self.port_edges[port_item]
+
+    def edges_for_port(self, port_item) -> list:
+        return self.port_edges.get(port_item, [])
+
+    def _disconnect_input(self, port_item):
+        for edge in list(self.edges_for_port(port_item)):
+            if edge.target_port is port_item:
+                if edge.edge:
+                    self.graph.remove_edge(edge.edge.id)
+                if edge.scene() is self:
+                    self.removeItem(edge)
+                self.unregister_edge_item(edge)
+
     def start_connection(self, port_item):
         if port_item.is_input:
-            for edge in list(self.edges):
-                if edge.target_port is port_item:
-                    if edge.edge:
-                        self.graph.remove_edge(edge.edge.id)
-                    if edge.scene() is self:
-                        self.removeItem(edge)
-                    self.edges.remove(edge)
+            self._disconnect_input(port_item)
 
         if self.drag_edge and self.drag_edge.scene() is self:
             self.removeItem(self.drag_edge)
@@ -85,13 +119,7 @@ class GraphScene(QGraphicsScene):
             target_item = start_port
 
         if target_item.is_input:
-            for edge in list(self.edges):
-                if edge.target_port is target_item:
-                    if edge.edge:
-                        self.graph.remove_edge(edge.edge.id)
-                    if edge.scene() is self:
-                        self.removeItem(edge)
-                    self.edges.remove(edge)
+            self._disconnect_input(target_item)
 
         edge_item = self.drag_edge
         edge_item.source_port = source_item
@@ -117,7 +145,6 @@ class GraphScene(QGraphicsScene):
     def _is_valid_connection(self, a: PortItem, b: PortItem) -> bool:
         return GraphValidator.is_valid_connection(
             self.graph,
-            self.edges,
             a,
             b
         )
@@ -159,13 +186,52 @@ class GraphScene(QGraphicsScene):
 
         self.addItem(edge_item)
         edge_item.update_positions()
-        self.edges.append(edge_item)
+        self.register_edge_item(edge_item)
 
     def update_edges_for_node(self, node_item):
         for port_item in node_item.port_items.values():
-            for edge in list(self.edges):
-                if edge.source_port == port_item or edge.target_port == port_item:
-                    edge.update_positions()
+            for edge in self.edges_for_port(port_item):
+                edge.update_positions()
+
+    def node_moved(self, node_item):
+        if len(self._move_start) > 1:
+            for port_item in node_item.port_items.values():
+                for edge in self.edges_for_port(port_item):
+                    self._dirty_edges[edge] = None
+            if not self._edge_timer.isActive():
+                self._edge_timer.start()
+        else:
+            self.update_edges_for_node(node_item)
+
+    def flush_edge_updates(self):
+        self._edge_timer.stop()
+        dirty, self._dirty_edges = self._dirty_edges, {}
+        for edge in dirty:
+            if edge in self.edges:
+                edge.update_positions()
+
+    def mousePressEvent(self, event):
+        super().mousePressEvent(event)
+        if isinstance(self.mouseGrabberItem(), NodeItem):
+            self._move_start = {
+                item: item.pos() for item in self.selectedItems() if isinstance(item, NodeItem)
+            }
+
+    def mouseReleaseEvent(self, event):
+        super().mouseReleaseEvent(event)
+        if not self._move_start:
+            return
+        moves, self._move_start = self._move_start, {}
+        self.flush_edge_updates()
+
+        moved = [(item, old_pos) for item, old_pos in moves.items() if item.pos() != old_pos and item.scene() is self]
+        if not moved or not self.views():
+            return
+        view = self.views()[0]
+        view.undo_stack.beginMacro("Move Nodes" if len(moved) > 1 else "Move Node")
+        for item, old_pos in moved:
+            view.undo_stack.push(MoveNodeCommand(view, item.node.id, old_pos, item.pos()))
+        view.undo_stack.endMacro()
 
     def mouseMoveEvent(self, event):
         if self.drag_edge:
@@ -3,7 +3,6 @@ from PySide6.QtCore import Qt, Signal, QRectF, QPointF, QEvent, QPropertyAnimati
 from PySide6.QtGui import QPainter, QColor, QCursor, QMouseEvent, QKeySequence, QUndoStack
 from core.graph import Port
 from core.port_types import PortType
-from ui.palette import NodePalette
 from ui.graph_scene import GraphScene
 from ui.node_item import NodeItem
 from ui.edge_item import EdgeItem
@@ -13,6 +12,7 @@ from core.clipboard import GraphClipboard
 from core.serializer import Serializer
 from nodes.registry import create_node
 from core.debug import Debug
+from core.traduction import Traduction
 from commands.undo_commands import *
 from core.layout import GraphLayoutEngine
 
@@ -96,6 +96,7 @@ class GraphView(QGraphicsView):
         if self._palette and self._palette.isVisible():
             self._palette.close()
 
+        from ui.palette import NodePalette # Imported on first use, not needed at startup
         palette = NodePalette(self)
         self._palette = palette
 
@@ -116,7 +117,7 @@ class GraphView(QGraphicsView):
 
     def _add_node_from_palette(self, node_type, scene_pos):
         editor = self.editor
-        node = editor.node_factory.create_node(node_type)
+        node = editor.create_node(node_type)
         if not node:
             self.close_node_palette()
             return
@@ -158,6 +159,32 @@ class GraphView(QGraphicsView):
         self.node_items[node.id] = node_item
         return node_item
 
+    def show_heatmap(self, timings, metric="total"):
+        # timings: node id -> NodeTiming (core.profiler), nodes are colored by their share
+        # of the hottest one for the metric ("total" or "self_time")
+        hottest = max((getattr(t, metric) for t in timings.values()), default=0)
+        for node_id, node_item in self.node_items.items():
+            timing = timings.get(node_id)
+            if timing is None or hottest <= 0:
+                node_item.set_heat(None)
+                continue
+            node_item.set_heat(getattr(timing, metric) / hottest, Traduction.get_trad(
+                "profile_node_tooltip", "Calls: {calls}\nTotal: {total:.1f} ms\nSelf: {self_time:.1f} ms",
+                calls=timing.calls, total=timing.total * 1000, self_time=timing.self_time * 1000
+            ))
+
+    def clear_heatmap(self):
+        for node_item in self.node_items.values():
+            node_item.set_heat(None)
+
+    def focus_node(self, node_id):
+        node_item = self.node_items.get(node_id)
+        if node_item is None:
+            return
+        self.graph_scene.clearSelection()
+        node_item.setSelected(True)
+        self.centerOn(node_item)
+
     def add_edge_item(self, edge):
         source_node_item = self.node_items.get(edge.source.node.id)
         target_node_item = self.node_items.get(edge.target.node.id)
@@ -177,7 +204,7 @@ class GraphView(QGraphicsView):
         self.graph_scene.addItem(edge_item)
         edge_item.update_positions()
 
-        self.graph_scene.edges.append(edge_item)
+        self.graph_scene.register_edge_item(edge_item)
         self.edge_items[edge.id] = edge_item
         return edge_item
     
@@ -187,8 +214,7 @@ class GraphView(QGraphicsView):
             return
         if edge_item.scene() is self.graph_scene:
             self.graph_scene.removeItem(edge_item)
-        if edge_item in self.graph_scene.edges:
-            self.graph_scene.edges.remove(edge_item)
+        self.graph_scene.unregister_edge_item(edge_item)
         del self.edge_items[edge_id]
 
 
@@ -312,21 +338,22 @@ class GraphView(QGraphicsView):
 
         node_item = self.node_items[node_id]
 
-        for edge_item in list(self.graph_scene.edges):
-            if (
-                edge_item.source_port in node_item.port_items.values()
-                or edge_item.target_port in node_item.port_items.values()
-            ):
-                if edge_item.edge:
-                    if edge_item.edge and edge_item.edge.id in self.graph.edges:
-                        self.graph.remove_edge(edge_item.edge.id)
-                    if edge_item.edge.id in self.edge_items:
-                        del self.edge_items[edge_item.edge.id]
-                        self.graph.remove_edge(edge_item.edge.id)
-                if edge_item.scene() is self.graph_scene:
-                    self.graph_scene.removeItem(edge_item)
-
-                self.graph_scene.edges.remove(edge_item)
+        edge_items = {
+            edge_item: None
+            for port_item in node_item.port_items.values()
+            for edge_item in self.graph_scene.edges_for_port(port_item)
+        }
+        for edge_item in edge_items:
+            if edge_item.edge:
+                if edge_item.edge and edge_item.edge.id in self.graph.edges:
+                    self.graph.remove_edge(edge_item.edge.id)
+                if edge_item.edge.id in self.edge_items:
+                    del self.edge_items[edge_item.edge.id]
+                    self.graph.remove_edge(edge_item.edge.id)
+            if edge_item.scene() is self.graph_scene:
+                self.graph_scene.removeItem(edge_item)
+
+            self.graph_scene.unregister_edge_item(edge_item)
 
         self.graph.remove_node(node_id)
 
@@ -517,6 +544,7 @@ class GraphView(QGraphicsView):
         if self._palette and self._palette.isVisible():
             self._palette.close()
 
+        from ui.palette import NodePalette
         palette = NodePalette(self)
         self._palette = palette
 
@@ -532,7 +560,7 @@ class GraphView(QGraphicsView):
 
     def _add_node_connected_to(self, node_type, source_node_item):
         editor = self.editor
-        node = editor.node_factory.create_node(node_type)
+        node = editor.create_node(node_type)
         if not node:
             self.close_node_palette()
             return
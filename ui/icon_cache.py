@@ -0,0 +1,70 @@
+import os
+from PySide6.QtGui import QIcon, QPixmap
+from core.debug import Info
+from nodes.registry import NODE_REGISTRY
+from theme.theme import Theme
+
+class IconCache:
+    # Icons are looked up on disk and decoded once per node type / category, every
+    # NodeItem of a type shares the same pixmap. Needs a QApplication.
+    NODE_ICON_SIZE = 18
+
+    _icons = {}
+    _pixmaps = {}
+
+    @staticmethod
+    def _key(name: str) -> str:
+        return name.lower().replace(" ", "_")
+
+    @staticmethod
+    def _load(key, *candidates):
+        if key not in IconCache._icons:
+            icon = None
+            for relative_path in candidates:
+                path = Info.resource_path(relative_path)
+                if os.path.exists(path):
+                    icon = QIcon(path)
+                    break
+            IconCache._icons[key] = icon
+        return IconCache._icons[key]
+
+    @staticmethod
+    def node_icon(node_type: str) -> QIcon | None:
+        meta = NODE_REGISTRY.get(node_type)
+        if meta is None:
+            return None
+        category = IconCache._key(meta["category"])
+        return IconCache._load(
+            ("node", node_type),
+            f"assets/icons/nodes/{category}/{node_type}.png",
+            f"assets/icons/nodes/{category}/default.png",
+        )
+
+    @staticmethod
+    def node_pixmap(node_type: str, size: int = NODE_ICON_SIZE) -> QPixmap | None:
+        key = (node_type, size)
+        if key not in IconCache._pixmaps:
+            icon = IconCache.node_icon(node_type)
+            if icon is None or icon.isNull():
+                IconCache._pixmaps[key] = None
+            else:
+                IconCache._pixmaps[key] = icon.pixmap(size, size, QIcon.Normal, QIcon.On)
+        return IconCache._pixmaps[key]
+
+    @staticmethod
+    def category_icon(category: str) -> QIcon | None:
+        return IconCache._load(
+            ("category", Theme.type, category),
+            f"assets/icons/{Theme.type}/{IconCache._key(category)}.png",
+        )
+
+    @staticmethod
+    def preload():
+        for node_type, meta in NODE_REGISTRY.items():
+            IconCache.node_pixmap(node_type)
+            IconCache.category_icon(meta["category"])
+
+    @staticmethod
+    def clear():
+        IconCache._icons.clear()
+        IconCache._pixmaps.clear()
@@ -1,5 +1,19 @@
 from PySide6.QtWidgets import QWidget, QLabel, QVBoxLayout
-from PySide6.QtCore import Qt, QPropertyAnimation, QPoint, QTimer, QEasingCurve
+from PySide6.QtCore import Qt, QPropertyAnimation, QPoint, QTimer, QEasingCurve, QObject, Signal, Slot
+
+
+class MessageDispatcher(QObject):
+    # Lives on the GUI thread: messages emitted from worker threads are queued to it
+    message = Signal(str, str)
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.message.connect(self.show_message)
+
+    @Slot(str, str)
+    def show_message(self, message: str, level: str):
+        toast = MessageWidget(self.parent(), message, level)
+        toast.show_animated()
 
 
 class MessageWidget(QWidget):
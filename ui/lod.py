@@ -0,0 +1,29 @@
+from PySide6.QtWidgets import QGraphicsItem, QGraphicsPixmapItem, QGraphicsTextItem
+from core.config import Config
+
+# Level of detail: 1.0 at 100% zoom, thresholds are in Config
+
+
+def level_of_detail(painter, option) -> float:
+    return option.levelOfDetailFromTransform(painter.worldTransform())
+
+
+def show_details(painter, option) -> bool:
+    return level_of_detail(painter, option) >= Config.LOD_DETAIL
+
+
+class LodTextItem(QGraphicsTextItem):
+    # Node titles: skipped when zoomed out, cached otherwise (text layout is the costly part)
+    def __init__(self, text, parent=None):
+        super().__init__(text, parent)
+        self.setCacheMode(QGraphicsItem.DeviceCoordinateCache)
+
+    def paint(self, painter, option, widget=None):
+        if show_details(painter, option):
+            super().paint(painter, option, widget)
+
+
+class LodPixmapItem(QGraphicsPixmapItem):
+    def paint(self, painter, option, widget=None):
+        if show_details(painter, option):
+            super().paint(painter, option, widget)
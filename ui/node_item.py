@@ -1,31 +1,36 @@
 from unicodedata import category
-from PySide6.QtWidgets import QGraphicsItem, QGraphicsTextItem, QGraphicsPixmapItem
+from PySide6.QtWidgets import QGraphicsItem
 from PySide6.QtCore import QRectF, Qt, QPointF
 from PySide6.QtGui import QPainter, QColor, QPen, QBrush, QPainterPath, QIcon, QPixmap
 from core.graph import Node
 from theme.theme import Theme
 from ui.port_item import PortItem
-from nodes.registry import NODE_REGISTRY
+from ui.lod import LodPixmapItem, LodTextItem, show_details
+from ui.icon_cache import IconCache
 from core.traduction import Traduction
-import os
 
 class NodeItem(QGraphicsItem):
     WIDTH = 180
     HEADER_HEIGHT = 35
     PORT_SPACING = 25
     PORT_OFFSET = 15
+    BODY_COLOR = QColor("#34495E")
+    HEAT_COLOR = QColor("#E74C3C")
     
     def __init__(self, node: Node):
         super().__init__()
         self.node = node
         self.port_items = {}
         self.icon_item = None
+        # Profiler heatmap: share of the hottest node (0..1), None when not shown
+        self.heat = None
 
         self.setFlag(QGraphicsItem.ItemIsMovable, True)
         self.setFlag(QGraphicsItem.ItemIsSelectable, True)
         self.setFlag(QGraphicsItem.ItemSendsGeometryChanges, True)
+        self.setCacheMode(QGraphicsItem.DeviceCoordinateCache)
         
-        self.title_item = QGraphicsTextItem(Traduction.get_trad(node.node_type, node.title), self)
+        self.title_item = LodTextItem(Traduction.get_trad(node.node_type, node.title), self)
         self.title_item.setDefaultTextColor(QColor("#ECF0F1"))
         self.title_item.setPos(10, 8)
         
@@ -54,6 +59,10 @@ class NodeItem(QGraphicsItem):
         return QRectF(0, 0, self.WIDTH, self.height)
     
     def paint(self, painter, option, widget):
+        if not show_details(painter, option):
+            self.paint_simplified(painter)
+            return
+
         painter.setRenderHint(QPainter.Antialiasing)
         
         path = QPainterPath()
@@ -64,7 +73,7 @@ class NodeItem(QGraphicsItem):
         else:
             painter.setPen(QPen(QColor("#2C3E50"), 2))
         
-        painter.setBrush(QBrush(QColor("#34495E")))
+        painter.setBrush(QBrush(self.body_color()))
         painter.drawPath(path)
         
         header_rect = QRectF(0, 0, self.WIDTH, self.HEADER_HEIGHT)
@@ -75,11 +84,37 @@ class NodeItem(QGraphicsItem):
         painter.setPen(Qt.NoPen)
         painter.drawPath(header_path)
 
+    def paint_simplified(self, painter):
+        # Zoomed out: plain rectangles, no antialiasing
+        painter.setRenderHint(QPainter.Antialiasing, False)
+        rect = self.boundingRect()
+        painter.fillRect(rect, self.body_color())
+        painter.fillRect(QRectF(0, 0, self.WIDTH, self.HEADER_HEIGHT), QColor(self.node.color))
+        if self.isSelected():
+            painter.setPen(QPen(QColor("#3498DB"), 3))
+            painter.setBrush(Qt.NoBrush)
+            painter.drawRect(rect)
+
+    def body_color(self) -> QColor:
+        if self.heat is None:
+            return self.BODY_COLOR
+        base, hot = self.BODY_COLOR, self.HEAT_COLOR
+        return QColor(
+            round(base.red() + (hot.red() - base.red()) * self.heat),
+            round(base.green() + (hot.green() - base.green()) * self.heat),
+            round(base.blue() + (hot.blue() - base.blue()) * self.heat),
+        )
+
+    def set_heat(self, heat, tooltip=""):
+        self.heat = heat
+        self.setToolTip(tooltip)
+        self.update()
+
     def itemChange(self, change, value):
         if change == QGraphicsItem.ItemPositionHasChanged:
             scene = self.scene()
             if scene:
-                scene.update_edges_for_node(self)
+                scene.node_moved(self)
             self.node.x = value.x()
             self.node.y = value.y()
         return super().itemChange(change, value)
@@ -97,33 +132,17 @@ class NodeItem(QGraphicsItem):
         super().mousePressEvent(event)
 
     def get_icon_node(self, item: Node):
-        node = NODE_REGISTRY.get(item.title.lower().replace(" ", "_"))
-        if node is not None:
-            category = node["category"]
-            path = "assets/icons/nodes/{}/{}.png".format(
-                    category.lower().replace(" ", "_"),
-                    item.title.lower().replace(" ", "_")
-                )
-            if os.path.exists(path):
-                return QIcon(path)
-            else:
-                return QIcon("assets/icons/nodes/{}/default.png".format(category))
+        return IconCache.node_icon(item.node_type)
             
     def setup_icon(self):
-        icon = self.get_icon_node(self.node)
         padding = 8
         spacing = 6
-        icon_size = 18
+        icon_size = IconCache.NODE_ICON_SIZE
         x = padding
 
-        if icon and not icon.isNull():
-            pixmap = icon.pixmap(
-                icon_size,
-                icon_size,
-                QIcon.Normal,
-                QIcon.On
-            )
-            self.icon_item = QGraphicsPixmapItem(pixmap, self)
+        pixmap = IconCache.node_pixmap(self.node.node_type, icon_size)
+        if pixmap is not None:
+            self.icon_item = LodPixmapItem(pixmap, self)
             self.icon_item.setTransformationMode(Qt.SmoothTransformation)
             icon_y = (self.HEADER_HEIGHT - icon_size) / 2
             self.icon_item.setPos(x, icon_y)
@@ -1,11 +1,12 @@
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QLineEdit, QTreeWidget, QTreeWidgetItem
 )
-from PySide6.QtCore import Qt, Signal
+from PySide6.QtCore import Qt, Signal, QTimer
 from PySide6.QtGui import QIcon
 from nodes.registry import NODE_REGISTRY
+from core.search_index import node_search_index
 from theme.theme import Theme
-import os
+from ui.icon_cache import IconCache
 from core.traduction import Traduction
 from core.debug import Info
 
@@ -48,6 +49,10 @@ class CustomQTreeWidget(QTreeWidget):
 class NodePalette(QWidget):
     node_selected = Signal(str)
 
+    SEARCH_DELAY_MS = 80
+    # Hidden column holding the rank of each row, the tree is sorted on it
+    RANK_COLUMN = 1
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setWindowTitle(Traduction.get_trad("add_node", "Add Node"))
@@ -58,11 +63,19 @@ class NodePalette(QWidget):
 
         self.search_input = CustomQLineEdit(self)
         self.search_input.setPlaceholderText(Traduction.get_trad("search_nodes", "Search nodes..."))
-        self.search_input.textChanged.connect(self.filter_nodes)
         layout.addWidget(self.search_input)
 
+        # Typing only restarts the timer, the search runs once the user pauses
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(self.SEARCH_DELAY_MS)
+        self._search_timer.timeout.connect(self._run_search)
+        self.search_input.textChanged.connect(self._search_timer.start)
+
         self.tree = CustomQTreeWidget()
         self.tree.setHeaderHidden(True)
+        self.tree.setColumnCount(2)
+        self.tree.setColumnHidden(self.RANK_COLUMN, True)
         self.tree.itemDoubleClicked.connect(self.on_item_activated)
         self.tree.setMouseTracking(True)
         self.tree.viewport().setMouseTracking(True)
@@ -77,6 +90,11 @@ class NodePalette(QWidget):
 
     def populate_tree(self):
         self.tree.clear()
+        # node type -> row, category row -> its node types, what the last search showed and the
+        # rank of every row (node type or category row)
+        self._items = {}
+        self._category_types = {}
+        self._ranks = {}
 
         categories = {}
 
@@ -99,34 +117,80 @@ class NodePalette(QWidget):
             if ico:
                 cat_item.setIcon(0, ico)
 
+            self._category_types[cat_item] = []
             for label, node_type, description in sorted(categories[category]):
                 item = QTreeWidgetItem([Traduction.get_trad(f"{node_type}_label", label)])
                 item.setData(0, Qt.UserRole, node_type)
                 item.setToolTip(0, Traduction.get_trad(f"{node_type}_desc",description))
                 cat_item.addChild(item)
+                self._items[node_type] = item
+                self._category_types[cat_item].append(node_type)
 
             self.tree.addTopLevelItem(cat_item)
 
-    def filter_nodes(self, text):
-        text = text.lower()
+        self._visible = set(self._items)
 
-        first_Visible_item = None; 
+        # Alphabetical order, given back when the search is cleared
+        self._default_ranks = {}
         for i in range(self.tree.topLevelItemCount()):
             category = self.tree.topLevelItem(i)
-            visible_category = False
-
+            self._default_ranks[category] = i
             for j in range(category.childCount()):
-                item = category.child(j)
-                visible = text in item.text(0).lower()
-                item.setHidden(not visible)
-                visible_category |= visible
-                if visible and (first_Visible_item is None):
-                    first_Visible_item = item
-
-            category.setHidden(not visible_category)
-            category.setExpanded(True)
+                self._default_ranks[category.child(j).data(0, Qt.UserRole)] = j
+        self._set_ranks(self._default_ranks)
+
+    def _run_search(self):
+        self.filter_nodes(self.search_input.text())
 
-        self.tree.setCurrentItem(first_Visible_item)
+    def filter_nodes(self, text):
+        # Ranked search over every language (core.search_index). Only the rows that appear
+        # or disappear are touched, then the tree is sorted on the ranks
+        self._search_timer.stop()
+        ranked = node_search_index().search(text)
+        if ranked is None:
+            visible = set(self._items)
+            ranks = self._default_ranks
+        else:
+            ranked = [node_type for node_type in ranked if node_type in self._items]
+            visible = set(ranked)
+            ranks = {node_type: rank for rank, node_type in enumerate(ranked)}
+
+        for node_type in visible ^ self._visible:
+            self._items[node_type].setHidden(node_type not in visible)
+        self._visible = visible
+
+        if ranked is not None:
+            # A category comes at the rank of its best node type
+            for category, node_types in self._category_types.items():
+                best = min((ranks[node_type] for node_type in node_types if node_type in visible), default=None)
+                if best is not None:
+                    ranks[category] = best
+        for category, node_types in self._category_types.items():
+            hidden = not any(node_type in visible for node_type in node_types)
+            if category.isHidden() != hidden:
+                category.setHidden(hidden)
+            category.setExpanded(True)
+        self._set_ranks(ranks)
+
+        if ranked is None:
+            first_category = self.tree.topLevelItem(0)
+            first_visible_item = first_category.child(0) if first_category else None
+        else:
+            first_visible_item = self._items[ranked[0]] if ranked else None
+        self.tree.setCurrentItem(first_visible_item)
+
+    def _set_ranks(self, ranks):
+        changed = False
+        for key, rank in ranks.items():
+            if self._ranks.get(key) == rank:
+                continue
+            self._ranks[key] = rank
+            # Keys are node types, or category rows
+            item = self._items[key] if isinstance(key, str) else key
+            item.setText(self.RANK_COLUMN, f"{rank:08d}")
+            changed = True
+        if changed:
+            self.tree.sortItems(self.RANK_COLUMN, Qt.AscendingOrder)
 
     def on_item_activated(self, item, column):
         node_type = item.data(0, Qt.UserRole)
@@ -153,6 +217,8 @@ class NodePalette(QWidget):
         key = event.key()
 
         if key in (Qt.Key_Return, Qt.Key_Enter):
+            if self._search_timer.isActive():
+                self._run_search()
             item = self.tree.currentItem()
             if not item:
                 return
@@ -190,8 +256,4 @@ class NodePalette(QWidget):
         super().closeEvent(event)
 
     def get_icon(self, category):
-        theme = Theme.type
-        path = Info.resource_path(f"assets/icons/{theme}/{category.lower().replace(' ', '_')}.png")
-        if os.path.exists(path):
-            return QIcon(path)
-        return None
\ No newline at end of file
+        return IconCache.category_icon(category)
\ No newline at end of file
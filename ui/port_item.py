@@ -3,6 +3,7 @@ from PySide6.QtCore import QRectF, Qt
 from PySide6.QtGui import QBrush, QPen, QColor
 from core.graph import Port
 from core.port_types import PORT_STYLES
+from ui.lod import show_details
 
 class PortItem(QGraphicsEllipseItem):
     def __init__(self, port: Port, parent=None, is_input=False):
@@ -26,6 +27,10 @@ class PortItem(QGraphicsEllipseItem):
 
         self.highlight = False
 
+    def paint(self, painter, option, widget=None):
+        if show_details(painter, option):
+            super().paint(painter, option, widget)
+
     def center_scene_pos(self):
         return self.mapToScene(self.boundingRect().center())
 
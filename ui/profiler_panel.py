@@ -0,0 +1,80 @@
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QComboBox, QPushButton, QTableWidget,
+    QTableWidgetItem, QHeaderView, QAbstractItemView, QLabel
+)
+from PySide6.QtCore import Qt
+from core.traduction import Traduction
+
+class ProfilerPanel(QDialog):
+    # Result of a profiled run: the hottest nodes in a sortable table, and the heatmap on
+    # the graph view colored by total or self time. Double click a row to show the node.
+    METRICS = [
+        ("total", "profile_total_time", "Total time"),
+        ("self_time", "profile_self_time", "Self time"),
+    ]
+
+    def __init__(self, graph_view, timings, parent=None):
+        super().__init__(parent)
+        self.graph_view = graph_view
+        self.timings = timings
+        self.setWindowTitle(Traduction.get_trad("profile_title", "Profile"))
+        self.resize(560, 420)
+
+        layout = QVBoxLayout(self)
+
+        top = QHBoxLayout()
+        top.addWidget(QLabel(Traduction.get_trad("profile_color_by", "Color nodes by")))
+        self.metric_box = QComboBox()
+        for metric, key, fallback in self.METRICS:
+            self.metric_box.addItem(Traduction.get_trad(key, fallback), metric)
+        self.metric_box.currentIndexChanged.connect(self.show_heatmap)
+        top.addWidget(self.metric_box)
+        top.addStretch()
+        clear_btn = QPushButton(Traduction.get_trad("profile_clear", "Clear heatmap"))
+        clear_btn.clicked.connect(self.graph_view.clear_heatmap)
+        top.addWidget(clear_btn)
+        layout.addLayout(top)
+
+        self.table = QTableWidget(0, 5)
+        self.table.setHorizontalHeaderLabels([
+            Traduction.get_trad("profile_node", "Node"),
+            Traduction.get_trad("profile_type", "Type"),
+            Traduction.get_trad("profile_calls", "Calls"),
+            Traduction.get_trad("profile_total_ms", "Total (ms)"),
+            Traduction.get_trad("profile_self_ms", "Self (ms)"),
+        ])
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.verticalHeader().setVisible(False)
+        self.table.cellDoubleClicked.connect(self._focus_row)
+        layout.addWidget(self.table)
+
+        self._fill_table()
+        self.show_heatmap()
+
+    def _fill_table(self):
+        nodes = self.graph_view.graph.nodes
+        rows = [t for t in self.timings.values() if t.node_id in nodes]
+        self.table.setSortingEnabled(False)
+        self.table.setRowCount(len(rows))
+        for row, timing in enumerate(rows):
+            node = nodes[timing.node_id]
+            name = QTableWidgetItem(Traduction.get_trad(node.node_type, node.title))
+            name.setData(Qt.UserRole, timing.node_id)
+            self.table.setItem(row, 0, name)
+            self.table.setItem(row, 1, QTableWidgetItem(node.node_type))
+            # Numbers as display data so that columns sort numerically
+            for column, value in ((2, timing.calls), (3, timing.total * 1000), (4, timing.self_time * 1000)):
+                item = QTableWidgetItem()
+                item.setData(Qt.DisplayRole, value if column == 2 else round(value, 2))
+                item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                self.table.setItem(row, column, item)
+        self.table.setSortingEnabled(True)
+        self.table.sortByColumn(3, Qt.DescendingOrder)
+
+    def show_heatmap(self):
+        self.graph_view.show_heatmap(self.timings, self.metric_box.currentData())
+
+    def _focus_row(self, row, column):
+        self.graph_view.focus_node(self.table.item(row, 0).data(Qt.UserRole))
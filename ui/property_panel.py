@@ -1,8 +1,11 @@
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QLabel, QLineEdit
 )
+from PySide6.QtCore import Signal
 
 class PropertyPanel(QWidget): # TODO: traduction
+    property_changed = Signal(object, str)
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.layout = QVBoxLayout(self)
@@ -34,6 +37,7 @@ class PropertyPanel(QWidget): # TODO: traduction
     def _update_property(self, key, value):
         if self.current_node:
             self.current_node.properties[key] = value
+            self.property_changed.emit(self.current_node, key)
 
     def clear(self):
         while self.layout.count():
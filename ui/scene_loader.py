@@ -0,0 +1,73 @@
+from PySide6.QtCore import QObject, QRectF, QTimer, Signal
+from PySide6.QtGui import QColor
+from PySide6.QtWidgets import QGraphicsScene
+from ui.comment_box import CommentBoxItem
+
+class SceneLoader(QObject):
+    # Fills a GraphView with the items of its graph in chunks, going back to the event
+    # loop between them so the window stays responsive and can show progress. The
+    # scene index is off while inserting and rebuilt once at the end.
+    progress = Signal(int, int)
+    finished = Signal()
+
+    CHUNK_SIZE = 500
+
+    def __init__(self, view, comments=(), parent=None):
+        super().__init__(parent)
+        self.view = view
+        self.comments = list(comments)
+        self.total = len(view.graph.nodes) + len(view.graph.edges) + len(self.comments)
+        self._steps = None
+        # Owned timer: stops with the loader if the view is replaced mid-load
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._step)
+
+    def start(self):
+        scene = self.view.graph_scene
+        scene.setItemIndexMethod(QGraphicsScene.NoIndex)
+        self.view.setInteractive(False)
+        self._steps = self._populate()
+        self._step()
+
+    def _populate(self):
+        view = self.view
+        done = 0
+        # The graph can't change while loading, the view is not interactive
+        for node in list(view.graph.nodes.values()):
+            view.add_node_item(node)
+            done += 1
+            if done % self.CHUNK_SIZE == 0:
+                yield done
+
+        for edge in list(view.graph.edges.values()):
+            view.add_edge_item(edge)
+            done += 1
+            if done % self.CHUNK_SIZE == 0:
+                yield done
+
+        for c in self.comments:
+            box = CommentBoxItem(
+                rect=QRectF(0, 0, c["w"], c["h"]),
+                title=c["title"]
+            )
+            box.setPos(c["x"], c["y"])
+            box.setBrush(QColor(*c["color"]))
+            box.set_locked(c.get("locked", False))
+            view.scene().addItem(box)
+            done += 1
+        yield done
+
+    def _step(self):
+        try:
+            done = next(self._steps)
+        except StopIteration:
+            self._finish()
+            return
+        self.progress.emit(done, self.total)
+        self._timer.start(0)
+
+    def _finish(self):
+        self.view.graph_scene.setItemIndexMethod(QGraphicsScene.BspTreeIndex)
+        self.view.setInteractive(True)
+        self.finished.emit()
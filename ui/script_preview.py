@@ -0,0 +1,237 @@
+from typing import Dict, List
+from PySide6.QtWidgets import QAbstractScrollArea, QApplication, QMenu
+from PySide6.QtCore import Qt, QRect
+from PySide6.QtGui import QColor, QFontDatabase, QFontMetrics, QKeySequence, QPainter
+from core.highlights import HIGHLIGHT_COLORS, find_functions, tokenize_line
+from core.traduction import Traduction
+
+
+class ScriptPreview(QAbstractScrollArea):
+    # Read-only view of the generated script that only lays out and highlights the lines on
+    # screen (plus MARGIN lines around them), so 100k+ line scripts scroll as fast as small ones.
+    # New text is diffed against the current lines: unchanged lines keep their highlighting and
+    # the view stays on the same lines. Selection works on whole lines.
+    MARGIN = 50
+    MAX_CACHED_LINES = 20000
+    PADDING = 4
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.lines: List[str] = [""]
+        self.known_functions = set()
+        # line text -> [(start, end, kind)] runs, the highlighting only depends on the text
+        self._runs: Dict[str, list] = {}
+        self._longest = 0
+        self._anchor = None
+        self._cursor = None
+
+        self.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
+        self.setFocusPolicy(Qt.StrongFocus)
+        self.viewport().setCursor(Qt.IBeamCursor)
+        self.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.customContextMenuRequested.connect(self._show_context_menu)
+
+        self._colors = {kind: QColor(color) for kind, color in HIGHLIGHT_COLORS.items()}
+        self._update_scrollbars()
+
+    def setPlainText(self, text: str):
+        new_lines = text.split("\n")
+        old_lines = self.lines
+
+        # Only the lines between the common head and tail are replaced
+        limit = min(len(old_lines), len(new_lines))
+        head = 0
+        while head < limit and old_lines[head] == new_lines[head]:
+            head += 1
+        tail = 0
+        while tail < limit - head and old_lines[-1 - tail] == new_lines[-1 - tail]:
+            tail += 1
+
+        removed = old_lines[head:len(old_lines) - tail]
+        added = new_lines[head:len(new_lines) - tail]
+        if not removed and not added:
+            return
+        self.lines[head:len(old_lines) - tail] = added
+
+        # Lines inserted or removed above the view don't move what is on screen
+        scrollbar = self.verticalScrollBar()
+        first = scrollbar.value()
+        self._refresh_functions(removed, added)
+        self._longest = max(map(len, self.lines))
+        self._clear_selection()
+        self._update_scrollbars()
+        if head + len(removed) <= first:
+            scrollbar.setValue(first + len(added) - len(removed))
+        self.viewport().update()
+
+    def toPlainText(self) -> str:
+        return "\n".join(self.lines)
+
+    def line_count(self) -> int:
+        return len(self.lines)
+
+    def set_line(self, index: int, text: str):
+        old = self.lines[index]
+        if old == text:
+            return
+        self.lines[index] = text
+        self._refresh_functions([old], [text])
+        self._longest = max(self._longest, len(text))
+        self._update_scrollbars()
+        self.viewport().update()
+
+    def _refresh_functions(self, removed, added):
+        # The function names color their calls on every line: only looked for again when a
+        # definition line was added or removed
+        if not find_functions("\n".join(removed)) and not find_functions("\n".join(added)):
+            return
+        functions = find_functions("\n".join(self.lines))
+        if functions != self.known_functions:
+            self.known_functions = functions
+            self._runs.clear()
+
+    def _line_runs(self, text: str) -> list:
+        runs = self._runs.get(text)
+        if runs is not None:
+            return runs
+        # Overlapping spans are flattened into runs of one kind, the last span wins
+        kinds = [None] * len(text)
+        for start, length, kind in tokenize_line(text, self.known_functions):
+            kinds[start:start + length] = [kind] * length
+        runs = []
+        start = 0
+        for i in range(1, len(text) + 1):
+            if i == len(text) or kinds[i] != kinds[start]:
+                runs.append((start, i, kinds[start]))
+                start = i
+        if len(self._runs) >= self.MAX_CACHED_LINES:
+            self._runs.clear()
+        self._runs[text] = runs
+        return runs
+
+    def _line_height(self) -> int:
+        return QFontMetrics(self.font()).lineSpacing()
+
+    def _visible_lines(self) -> int:
+        return max(1, self.viewport().height() // self._line_height())
+
+    def _update_scrollbars(self):
+        visible = self._visible_lines()
+        vertical = self.verticalScrollBar()
+        vertical.setRange(0, max(0, len(self.lines) - visible))
+        vertical.setPageStep(visible)
+        vertical.setSingleStep(1)
+
+        # Fixed width font: the longest line gives the width without measuring every line
+        width = QFontMetrics(self.font()).horizontalAdvance("M") * self._longest + 2 * self.PADDING
+        horizontal = self.horizontalScrollBar()
+        horizontal.setRange(0, max(0, width - self.viewport().width()))
+        horizontal.setPageStep(self.viewport().width())
+        horizontal.setSingleStep(20)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._update_scrollbars()
+
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == event.Type.FontChange:
+            self._update_scrollbars()
+
+    def scrollContentsBy(self, dx, dy):
+        self.viewport().update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self.viewport())
+        painter.setFont(self.font())
+        palette = self.palette()
+        painter.fillRect(self.viewport().rect(), palette.base())
+
+        metrics = QFontMetrics(self.font())
+        line_height = metrics.lineSpacing()
+        char_width = metrics.horizontalAdvance("M")
+        first = self.verticalScrollBar().value()
+        last = min(len(self.lines), first + self._visible_lines() + 1)
+        x0 = self.PADDING - self.horizontalScrollBar().value()
+        selection = self._selection()
+        text_color = palette.text().color()
+
+        for index in range(first, last):
+            y = (index - first) * line_height
+            if selection and selection[0] <= index <= selection[1]:
+                painter.fillRect(QRect(0, y, self.viewport().width(), line_height), palette.highlight())
+            text = self.lines[index]
+            for start, end, kind in self._line_runs(text):
+                painter.setPen(self._colors[kind] if kind else text_color)
+                font = painter.font()
+                font.setItalic(kind == "comment")
+                painter.setFont(font)
+                painter.drawText(x0 + start * char_width, y + metrics.ascent(), text[start:end])
+        painter.end()
+
+        # Highlights the lines around the view ahead of time, they are likely to come next
+        for index in range(max(0, first - self.MARGIN), min(len(self.lines), last + self.MARGIN)):
+            self._line_runs(self.lines[index])
+
+    def _line_at(self, y: int) -> int:
+        index = self.verticalScrollBar().value() + y // self._line_height()
+        return max(0, min(len(self.lines) - 1, index))
+
+    def _selection(self):
+        if self._anchor is None or self._cursor is None:
+            return None
+        return min(self._anchor, self._cursor), max(self._anchor, self._cursor)
+
+    def _clear_selection(self):
+        self._anchor = self._cursor = None
+
+    def selected_text(self) -> str:
+        selection = self._selection()
+        if selection is None:
+            return ""
+        return "\n".join(self.lines[selection[0]:selection[1] + 1])
+
+    def select_all(self):
+        self._anchor, self._cursor = 0, len(self.lines) - 1
+        self.viewport().update()
+
+    def copy(self):
+        text = self.selected_text()
+        if text:
+            QApplication.clipboard().setText(text)
+
+    def mousePressEvent(self, event):
+        if event.button() != Qt.LeftButton:
+            return super().mousePressEvent(event)
+        line = self._line_at(int(event.position().y()))
+        if not (event.modifiers() & Qt.ShiftModifier) or self._anchor is None:
+            self._anchor = line
+        self._cursor = line
+        self.viewport().update()
+
+    def mouseMoveEvent(self, event):
+        if not (event.buttons() & Qt.LeftButton) or self._anchor is None:
+            return super().mouseMoveEvent(event)
+        y = int(event.position().y())
+        # Dragging past the edges scrolls
+        if y < 0:
+            self.verticalScrollBar().setValue(self.verticalScrollBar().value() - 1)
+        elif y > self.viewport().height():
+            self.verticalScrollBar().setValue(self.verticalScrollBar().value() + 1)
+        self._cursor = self._line_at(y)
+        self.viewport().update()
+
+    def keyPressEvent(self, event):
+        if event.matches(QKeySequence.Copy):
+            self.copy()
+        elif event.matches(QKeySequence.SelectAll):
+            self.select_all()
+        else:
+            super().keyPressEvent(event)
+
+    def _show_context_menu(self, position):
+        menu = QMenu(self)
+        copy_action = menu.addAction(Traduction.get_trad("preview_copy", "Copy"), self.copy)
+        copy_action.setEnabled(self._selection() is not None)
+        menu.addAction(Traduction.get_trad("preview_select_all", "Select All"), self.select_all)
+        menu.exec(self.viewport().mapToGlobal(position))
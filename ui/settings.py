@@ -164,6 +164,12 @@ class SettingsDialog(QDialog):
         self.auto_save_row, self.auto_save_label = create_switch_row(
             "auto_save", "Auto Save", "AUTO_SAVE"
         )
+        self.incremental_row, self.incremental_label = create_switch_row(
+            "incremental_gen", "Incremental Generation", "INCREMENTAL_GEN"
+        )
+        self.builtins_row, self.builtins_label = create_switch_row(
+            "prefer_builtins", "Prefer Bash Builtins", "PREFER_BUILTINS"
+        )
         self.shebang_label = QLabel(
             Traduction.get_trad("custom_shebang", "Custom Shebang")
         )
@@ -181,6 +187,8 @@ class SettingsDialog(QDialog):
         self.layout.addLayout(self.tty_row)
         self.layout.addLayout(self.sync_row)
         self.layout.addLayout(self.auto_save_row)
+        self.layout.addLayout(self.incremental_row)
+        self.layout.addLayout(self.builtins_row)
 
     def _build_footer(self):
         self.layout.addStretch()
@@ -295,6 +303,12 @@ class SettingsDialog(QDialog):
         self.auto_save_label.setText(
             Traduction.get_trad("auto_save", "Auto Save")
         )
+        self.incremental_label.setText(
+            Traduction.get_trad("incremental_gen", "Incremental Generation")
+        )
+        self.builtins_label.setText(
+            Traduction.get_trad("prefer_builtins", "Prefer Bash Builtins")
+        )
 
         self.close_btn.setText(
             Traduction.get_trad("close", "Close")